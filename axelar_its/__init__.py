@@ -0,0 +1 @@
+"""Data layer for the Axelar ITS interchain transfers dashboard."""
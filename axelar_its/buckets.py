@@ -0,0 +1,65 @@
+"""Transfer size classes defined by a list of boundaries.
+
+The classes used to be spelled out three times - bins, labels and the chart
+colors - and assigned with a seven-branch CASE per row in SQL. A
+:class:`SizeClasses` is built from the upper boundaries alone; labels and
+colors are derived from them and rows are assigned in one vectorized
+``np.searchsorted`` pass. Class ``i`` holds ``boundaries[i-1] < V <= boundaries[i]``,
+with open-ended first and last classes, exactly like the original bins.
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BOUNDARIES = (100, 1_000, 10_000, 20_000, 50_000, 100_000)
+# Color stops from the smallest to the largest class; interpolated when the class count differs.
+DEFAULT_COLORS = ("#d9fd51", "#b1f85a", "#8be361", "#639d55", "#4a7c42", "#7a4c89", "#cd00fc")
+
+
+def _short(value):
+    """``1000 -> "1k"``, ``2500000 -> "2.5M"``, ``100 -> "100"``."""
+    for factor, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "k")):
+        if abs(value) >= factor:
+            return f"{value / factor:g}{suffix}"
+    return f"{value:g}"
+
+
+def _interpolate(stops, n):
+    """``n`` hex colors spread evenly along the ``stops`` gradient."""
+    if n == len(stops):
+        return list(stops)
+    rgb = np.array([[int(stop[i:i + 2], 16) for i in (1, 3, 5)] for stop in stops], dtype=float)
+    positions = np.linspace(0, len(stops) - 1, n)
+    colors = np.column_stack([np.interp(positions, np.arange(len(stops)), rgb[:, channel]) for channel in range(3)])
+    return ["#%02x%02x%02x" % tuple(color) for color in np.rint(colors).astype(int)]
+
+
+class SizeClasses:
+    def __init__(self, boundaries=DEFAULT_BOUNDARIES, unit="ATH", colors=DEFAULT_COLORS):
+        boundaries = [float(boundary) for boundary in boundaries]
+        if not boundaries or any(a >= b for a, b in zip(boundaries, boundaries[1:])):
+            raise ValueError(f"size class boundaries must be non-empty and strictly increasing: {boundaries}")
+        self.boundaries = np.array(boundaries)
+        self.unit = unit
+        names = [_short(boundary) for boundary in boundaries]
+        self.labels = [
+            f"V<={names[0]} {unit}",
+            *(f"{low}<V<={high} {unit}" for low, high in zip(names, names[1:])),
+            f"V>{names[-1]} {unit}",
+        ]
+        self.colors = dict(zip(self.labels, _interpolate(colors, len(self.labels))))
+
+    @property
+    def key(self):
+        """Short identifier of the class definition, for cache namespaces."""
+        return ",".join(f"{boundary:g}" for boundary in self.boundaries)
+
+    def assign(self, amounts):
+        """Class label of every amount (None where the amount is missing)."""
+        values = np.asarray(amounts, dtype=float)
+        labels = np.asarray(self.labels, dtype=object)[np.searchsorted(self.boundaries, values, side="left")]
+        labels[np.isnan(values)] = None
+        return pd.Series(labels, index=getattr(amounts, "index", None), dtype=object)
+
+
+DEFAULT = SizeClasses()
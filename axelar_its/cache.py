@@ -0,0 +1,325 @@
+"""Two-tier result cache for panels and rollup chunks: in-memory LRU in front of a disk store.
+
+The disk tier is a plain directory of pickles, so it survives restarts and
+can be shared by several replicas mounting the same volume. Entries are keyed
+by a :func:`fingerprint` of what they hold and expire after a TTL, which may
+depend on the date range they cover (see :class:`DateRangeTTL`). Both tiers
+evict least recently used entries once they outgrow their byte budget, and
+hits, misses and evictions are counted in :meth:`TwoTierCache.stats`.
+Concurrent misses on one key - from threads of this process or from other
+processes on the same directory - are collapsed into a single computation by
+a per-key lock file. Lock files of keys without an entry are removed by disk
+eviction, but only while nobody holds them.
+"""
+
+import fcntl
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from axelar_its import instrumentation
+
+logger = logging.getLogger(__name__)
+
+
+def _canonical(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        # Content digest: values and index, plus the labels and dtypes hash_pandas_object leaves out.
+        content = pd.util.hash_pandas_object(value, index=True).values.tobytes()
+        labels = repr((list(value.columns), [str(dtype) for dtype in value.dtypes])) if isinstance(value, pd.DataFrame) else value.name
+        return [type(value).__name__, hashlib.sha256(content).hexdigest(), repr(labels)]
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in sorted(value.items())}
+    return value
+
+
+def fingerprint(*parts):
+    """Stable hex digest of ``parts`` (dates, numbers, strings, frames and nested lists/dicts of them)."""
+    return hashlib.sha256(repr(_canonical(list(parts))).encode("utf-8")).hexdigest()
+
+
+def _seconds(ttl):
+    return ttl.total_seconds() if isinstance(ttl, timedelta) else float(ttl)
+
+
+def column_bytes(series):
+    """Deep bytes of a column; values with an ``nbytes`` (sender sketches) are counted by it."""
+    if series.dtype == object and len(series):
+        values = series.dropna()
+        if len(values) and hasattr(values.iloc[0], "nbytes"):
+            return int(series.index.memory_usage() + sum(value.nbytes for value in values))
+    return int(series.memory_usage(deep=True))
+
+
+def sizeof(value):
+    """Approximate in-memory size of a cached value in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.index.memory_usage() + sum(column_bytes(value[column]) for column in value.columns))
+    if isinstance(value, pd.Series):
+        return column_bytes(value)
+    if isinstance(value, (list, tuple)):
+        return sum(sizeof(item) for item in value)
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class DateRangeTTL:
+    """TTL policy for loaders taking an ``end_date`` (and optionally a ``symbol``).
+
+    Ranges that ended before ``today - settle`` only cover history the store no
+    longer re-checks, so they are cached for ``history``; ranges reaching into
+    the last ``settle`` days can still change and get ``recent``. With a
+    ``settled_before`` callable (:meth:`TransferStore.settled_before
+    <axelar_its.store.TransferStore.settled_before>`), a range must also end
+    before what the store has synced for good: results built on a store that is
+    empty, wiped or behind get ``recent`` and are rebuilt once it catches up.
+    """
+
+    def __init__(self, history=timedelta(days=7), recent=timedelta(minutes=10), settle=timedelta(days=2),
+                 settled_before=None):
+        self.history = history
+        self.recent = recent
+        self.settle = settle
+        self.settled_before = settled_before
+
+    def __call__(self, arguments):
+        end_date = arguments.get("end_date")
+        if end_date is None:
+            return self.recent
+        settled = pd.Timestamp.now().normalize() - pd.Timedelta(self.settle)
+        if self.settled_before is not None:
+            covered = self.settled_before(arguments.get("symbol"))
+            if covered is None:
+                return self.recent
+            settled = min(settled, covered)
+        # end_date is a whole day: every row of it must come before the cutoff.
+        return self.history if pd.Timestamp(end_date) + pd.Timedelta(days=1) <= settled else self.recent
+
+
+class TwoTierCache:
+    def __init__(self, directory, ttl=timedelta(hours=24), memory_bytes=256 << 20, max_disk_bytes=1 << 30):
+        """
+        ttl:            a duration, or a callable mapping a call's arguments to one (see :meth:`ttl_for`)
+        memory_bytes:   budget of the in-memory tier, shared by every cached value
+        max_disk_bytes: budget of the disk directory
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.memory_bytes = memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()  # key -> (expires_at, value, size)
+        self._memory_used = 0
+        self._memory_lock = threading.Lock()
+        self._counts = Counter()
+        self._counts_lock = threading.Lock()
+        self._key_locks = {}  # key -> [lock, waiters]; per key so nested computations cannot collide
+        self._key_locks_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _count(self, event):
+        with self._counts_lock:
+            self._counts[event] += 1
+
+    def _hit(self, tier):
+        self._count(f"{tier}_hits")
+        instrumentation.annotate(cache=tier)
+
+    # --- Memory tier --------------------------------------------------------------------------------------------
+    def _memory_get(self, key):
+        with self._memory_lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                self._memory_used -= self._memory.pop(key)[2]
+                self._count("expirations")
+                return None
+            self._memory.move_to_end(key)
+            return entry[:2]
+
+    def _memory_put(self, key, entry):
+        size = sizeof(entry[1])
+        with self._memory_lock:
+            if key in self._memory:
+                self._memory_used -= self._memory.pop(key)[2]
+            if size > self.memory_bytes:
+                return  # larger than the whole budget: serve it from disk only
+            self._memory[key] = (*entry, size)
+            self._memory_used += size
+            while self._memory_used > self.memory_bytes:
+                _, (_, _, evicted) = self._memory.popitem(last=False)
+                self._memory_used -= evicted
+                self._count("memory_evictions")
+
+    # --- Disk tier ----------------------------------------------------------------------------------------------
+    def _path(self, key, suffix=".pkl"):
+        return os.path.join(self.directory, key + suffix)
+
+    def _disk_get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+        if entry[0] <= time.time():
+            _remove_quietly(path)
+            self._count("expirations")
+            return None
+        os.utime(path)  # mtime doubles as last-access time for LRU eviction
+        return entry
+
+    def _disk_put(self, key, entry):
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        files = []
+        names = os.listdir(self.directory)
+        for name in names:
+            if name.endswith(".pkl"):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            _remove_quietly(os.path.join(self.directory, name))
+            total -= size
+            self._count("disk_evictions")
+        # Lock files of keys without an entry (evicted or expired); held ones stay, see _locked_file.
+        for name in names:
+            if name.endswith(".lock") and not os.path.exists(os.path.join(self.directory, name[:-len(".lock")] + ".pkl")):
+                _remove_unheld_lock(os.path.join(self.directory, name))
+
+    # --- Locking ------------------------------------------------------------------------------------------------
+    @contextmanager
+    def _key_lock(self, key):
+        """Serialize misses on ``key`` across threads (a lock per key) and processes (``flock``)."""
+        with self._key_locks_lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0], _locked_file(self._path(key, ".lock")) as lock_file:
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            with self._key_locks_lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[key]
+
+    # --- API ----------------------------------------------------------------------------------------------------
+    def get_or_compute(self, key, compute, ttl=None):
+        """Return the cached value for ``key``, computing and storing it once on a miss."""
+        entry = self._memory_get(key)
+        if entry is not None:
+            self._hit("memory")
+            return entry[1]
+        with self._key_lock(key):
+            entry = self._memory_get(key)
+            if entry is not None:
+                self._hit("memory")
+                return entry[1]
+            entry = self._disk_get(key)
+            if entry is not None:
+                self._hit("disk")
+            else:
+                self._count("misses")
+                instrumentation.annotate(cache="miss")
+                entry = (time.time() + _seconds(self.ttl if ttl is None else ttl), compute())
+                self._disk_put(key, entry)
+                logger.info("cache miss %s; %s", key[:12], self.stats())
+            self._memory_put(key, entry)
+            return entry[1]
+
+    def get(self, key):
+        """The cached value for ``key`` from either tier, or None; never computes."""
+        entry = self._memory_get(key)
+        if entry is not None:
+            self._hit("memory")
+            return entry[1]
+        entry = self._disk_get(key)
+        if entry is None:
+            return None
+        self._hit("disk")
+        self._memory_put(key, entry)
+        return entry[1]
+
+    def put(self, key, value, ttl=None):
+        """Store ``value`` under ``key`` in both tiers, replacing any cached value (e.g. after a refresh)."""
+        entry = (time.time() + _seconds(self.ttl if ttl is None else ttl), value)
+        with self._key_lock(key):
+            self._disk_put(key, entry)
+            self._memory_put(key, entry)
+
+    def ttl_for(self, arguments):
+        """The TTL the policy assigns to a call with the given (bound) ``arguments``."""
+        return self.ttl(arguments) if callable(self.ttl) else self.ttl
+
+    def stats(self):
+        """Hit, miss, eviction and expiration counters plus current memory-tier usage."""
+        with self._memory_lock, self._counts_lock:
+            return {
+                **{name: self._counts[name] for name in (
+                    "memory_hits", "disk_hits", "misses", "memory_evictions", "disk_evictions", "expirations",
+                )},
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_used,
+            }
+
+
+def _locked_file(path):
+    """``path`` opened and ``flock``-ed, retrying when eviction unlinked it before the lock was taken."""
+    while True:
+        lock_file = open(path, "a")
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            if os.stat(path).st_ino == os.fstat(lock_file.fileno()).st_ino:
+                return lock_file
+        except FileNotFoundError:
+            pass
+        lock_file.close()
+
+
+def _remove_unheld_lock(path):
+    """Unlink the lock file at ``path`` unless it is held; it stays locked until unlinked, see :func:`_locked_file`."""
+    try:
+        lock_file = open(path, "r")
+    except FileNotFoundError:
+        return
+    with lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return
+        _remove_quietly(path)
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,75 @@
+"""Compact in-memory layout of extract rows.
+
+Chains, sender addresses and tx ids repeat across rows, and as Python string
+objects every row pays for its own copy. :func:`compact` keeps them as
+categoricals instead - integer codes into one dictionary of the distinct
+values - and narrows the derived USD columns to ``float32`` where every value
+survives the round trip well within the precision it is displayed with. Parquet
+partitions of the store are dictionary-encoded on disk, so :func:`read_parquet`
+decodes those columns straight into categoricals without building a string
+per row. :func:`memory_report` shows what each in-memory frame costs.
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from axelar_its.cache import column_bytes
+
+# Columns held as dictionary codes.
+CATEGORICAL = ["tx_id", "sender_address", "source_chain", "destination_chain", "gas_symbol"]
+# Float columns and the decimals the dashboard shows them with; narrowed only when float32 keeps them exact to that.
+# The USD inputs of the extract are multiplied before display, so they keep their precision, and so does
+# ``amount``: size classes are assigned from it, and float32 would move a value just above a class boundary onto it.
+FLOAT_DECIMALS = {"amount_usd": 2, "fee": 3}
+
+
+def _fits_float32(values, decimals):
+    values = values.to_numpy(dtype="float64", na_value=np.nan)
+    if not len(values):
+        return True
+    error = np.abs(values.astype(np.float32).astype(np.float64) - values)
+    # A tenth of half a display unit: rounding to ``decimals`` gives the same result either way in practice.
+    return bool(np.nanmax(error, initial=0.0) <= 0.05 * 10.0 ** -decimals)
+
+
+def compact(df):
+    """``df`` with :data:`CATEGORICAL` columns as categoricals and :data:`FLOAT_DECIMALS` columns narrowed if safe."""
+    changes = {}
+    for column in CATEGORICAL:
+        if column in df and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            changes[column] = df[column].astype("category")
+    for column, decimals in FLOAT_DECIMALS.items():
+        if column in df and df[column].dtype == "float64" and _fits_float32(df[column], decimals):
+            changes[column] = df[column].astype("float32")
+    return df.assign(**changes) if changes else df
+
+
+def read_parquet(paths, columns=None, filters=None):
+    """The rows of ``paths`` as one compact frame, dictionary columns decoded as categoricals."""
+    tables = []
+    for path in paths:
+        schema = pq.read_schema(path)
+        dictionary = [column for column in CATEGORICAL if column in schema.names and (columns is None or column in columns)]
+        tables.append(pq.read_table(path, columns=columns, filters=filters, read_dictionary=dictionary))
+    # One dictionary per column across partitions, so pandas does not fall back to strings on concat.
+    table = pa.concat_tables(tables, promote_options="permissive").unify_dictionaries()
+    return compact(table.to_pandas())
+
+
+def memory_report(frames):
+    """``{name: frame}`` -> one row per frame: rows, bytes, bytes per row and its largest column."""
+    report = []
+    for name, df in frames.items():
+        columns = {column: column_bytes(df[column]) for column in df.columns}
+        total = sum(columns.values())
+        largest = max(columns, key=columns.get) if columns else None
+        report.append({
+            "frame": name,
+            "rows": len(df),
+            "MiB": total / 2**20,
+            "bytes/row": total / len(df) if len(df) else 0.0,
+            "largest column": f"{largest} ({df[largest].dtype})" if largest is not None else "",
+        })
+    return pd.DataFrame(report, columns=["frame", "rows", "MiB", "bytes/row", "largest column"])
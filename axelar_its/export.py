@@ -0,0 +1,126 @@
+"""Streaming export of the raw transfer list of one or more tokens to CSV or Parquet.
+
+Rows go from the warehouse cursor to the output file one result chunk at a
+time (``fetch_arrow_batches``, or ``fetchmany`` on cursors without Arrow
+support), so memory stays flat however large the range is and the result is
+never assembled into a DataFrame. Each chunk is priced on its own (see
+:mod:`axelar_its.prices`) and cast to :data:`SCHEMA`, so the writers see one
+schema even when a chunk holds only NULLs in a column.
+
+Files are written into one export directory and are left for the session
+that asked for them to download; sessions are never told they ended, so each
+new export first removes the files older than ``max_age``.
+"""
+
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from axelar_its import instrumentation, sql
+from axelar_its.prices import PriceTable
+
+SCHEMA = pa.schema([
+    ("created_at", pa.timestamp("ns")),
+    ("tx_id", pa.string()),
+    ("sender_address", pa.string()),
+    ("amount", pa.float64()),
+    ("amount_usd", pa.float64()),
+    ("fee", pa.float64()),
+    ("source_chain", pa.string()),
+    ("destination_chain", pa.string()),
+    ("symbol", pa.string()),
+])
+
+FORMATS = {
+    "csv": ("text/csv", lambda path: pa_csv.CSVWriter(path, SCHEMA)),
+    "parquet": ("application/vnd.apache.parquet", lambda path: pq.ParquetWriter(path, SCHEMA, compression="zstd")),
+}
+
+FETCH_ROWS = 100_000
+
+DEFAULT_DIRECTORY = ".exports"
+DEFAULT_MAX_AGE = timedelta(hours=1)
+_PREFIX = "transfers_"
+
+
+def arrow_chunks(cursor, fetch_rows=FETCH_ROWS):
+    """Yield the pending result of ``cursor`` as Arrow tables of roughly one result chunk each."""
+    if hasattr(cursor, "fetch_arrow_batches"):
+        try:
+            yield from cursor.fetch_arrow_batches()
+            return
+        except Exception as exc:
+            # snowflake.connector.errors.NotSupportedError: the result was not returned in Arrow format.
+            if type(exc).__name__ != "NotSupportedError":
+                raise
+    columns = [column[0] for column in cursor.description]
+    while True:
+        rows = cursor.fetchmany(fetch_rows)
+        if not rows:
+            return
+        yield pa.Table.from_pydict(dict(zip(columns, zip(*rows))))
+
+
+def write_chunks(chunks, path, fmt):
+    """Write Arrow tables to ``path`` in ``fmt`` ("csv" or "parquet"); returns the row count."""
+    rows = 0
+    with FORMATS[fmt][1](path) as writer:
+        for table in chunks:
+            writer.write_table(table.select(SCHEMA.names).cast(SCHEMA))
+            rows += table.num_rows
+    return rows
+
+
+def priced_chunks(chunks, prices):
+    """Arrow tables of extract rows -> the same tables with ``amount_usd`` and ``fee`` from ``prices``."""
+    for table in chunks:
+        yield pa.Table.from_pandas(prices.apply(table.to_pandas()), preserve_index=False)
+
+
+def remove_stale(directory, max_age=DEFAULT_MAX_AGE):
+    """Remove the export files in ``directory`` last written more than ``max_age`` ago; returns how many."""
+    cutoff = time.time() - max_age.total_seconds()
+    removed = 0
+    for name in os.listdir(directory) if os.path.isdir(directory) else ():
+        path = os.path.join(directory, name)
+        try:
+            if name.startswith(_PREFIX) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            pass  # removed by another session's sweep
+    return removed
+
+
+def export_transfers(conn, start_date, end_date, fmt, directory=DEFAULT_DIRECTORY, symbols=sql.SYMBOL, prices=None,
+                     max_age=DEFAULT_MAX_AGE):
+    """Stream every transfer of ``symbols`` in ``[start_date, end_date]`` into a file in ``directory``, with one query.
+
+    USD columns are priced with ``prices``, by default the seed :class:`~axelar_its.prices.PriceTable`.
+    Exports older than ``max_age`` are removed from ``directory`` first (see :func:`remove_stale`).
+
+    Returns ``(path, rows)``; the file stays until a later export finds it stale.
+    """
+    os.makedirs(directory, exist_ok=True)
+    remove_stale(directory, max_age)
+    fd, path = tempfile.mkstemp(prefix=f"{_PREFIX}{start_date}_{end_date}_", suffix=f".{fmt}", dir=directory)
+    os.close(fd)
+    with instrumentation.span("export", "query", format=fmt) as span:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(*sql.extract(start_date, end_date, symbols=symbols))
+            span["query_id"] = getattr(cursor, "sfqid", None)
+            chunks = priced_chunks(arrow_chunks(cursor), prices if prices is not None else PriceTable())
+            span["rows"] = write_chunks(chunks, path, fmt)
+            span["bytes"] = os.path.getsize(path)
+            return path, span["rows"]
+        except BaseException:
+            os.remove(path)
+            raise
+        finally:
+            cursor.close()
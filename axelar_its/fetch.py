@@ -0,0 +1,60 @@
+"""Arrow-native result fetching.
+
+``pd.read_sql`` over DBAPI materializes every row as a Python tuple before
+pandas rebuilds the columns. The Snowflake connector can instead hand the
+result chunks over as Arrow tables (``fetch_arrow_batches``), which convert to
+pandas column by column with minimal copying. Cursors without Arrow support,
+e.g. a local stand-in database, fall back to the plain DBAPI path.
+"""
+
+import pandas as pd
+import pyarrow as pa
+
+from axelar_its import instrumentation
+from axelar_its.cache import fingerprint
+
+
+def _is_not_supported(exc):
+    # snowflake.connector.errors.NotSupportedError, raised when a result was not returned in Arrow format.
+    return type(exc).__name__ == "NotSupportedError"
+
+
+def _from_rows(cursor):
+    columns = [column[0] for column in cursor.description]
+    return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+
+
+def _from_arrow(cursor, span):
+    tables = list(cursor.fetch_arrow_batches())
+    if not tables:
+        # Empty results come back without batches; keep the column names at least.
+        return pd.DataFrame(columns=[column[0] for column in cursor.description])
+    table = pa.concat_tables(tables)
+    del tables
+    span["bytes"] = table.nbytes
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def fetch_frame(conn, query, params=None):
+    """Execute ``query`` and return its result as a DataFrame, through Arrow when the cursor supports it.
+
+    Recorded as a "query" span with the rows, the Arrow bytes received and the Snowflake query id.
+    """
+    with instrumentation.span("query", "query", fingerprint=fingerprint(query, params)[:12]) as span:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params) if params is not None else cursor.execute(query)
+            span["query_id"] = getattr(cursor, "sfqid", None)
+            df = None
+            if hasattr(cursor, "fetch_arrow_batches"):
+                try:
+                    df = _from_arrow(cursor, span)
+                except Exception as exc:
+                    if not _is_not_supported(exc):
+                        raise
+            if df is None:
+                df = _from_rows(cursor)
+            span["rows"] = len(df)
+            return df
+        finally:
+            cursor.close()
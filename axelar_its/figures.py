@@ -0,0 +1,224 @@
+"""Plotly figures of the dashboard rows, built from one pivot per dataset.
+
+Every builder reshapes its dataset once (``pivot_table`` to a date x series
+frame) and creates all traces from the columns of that pivot, instead of
+boolean-filtering the long frame once per trace. :func:`chart_timeframe`
+keeps the bar count of long ranges bounded by coarsening their buckets.
+Built figures are kept in a :class:`FigureCache` keyed by a fingerprint of
+the data and options, so a rerun that does not change a row's data (a widget
+elsewhere, a page of the tracker) reuses the figure objects without any
+pandas or Plotly work.
+"""
+
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.graph_objects as go
+
+from axelar_its import instrumentation, seasonality, transfers
+from axelar_its.cache import fingerprint
+from axelar_its.sql import SYMBOL
+
+PATH_SEQUENCE = ["#cd00fc", "#d9fd51"]
+
+_LEGEND_TOP = dict(title_text="", orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5)
+
+
+class FigureCache:
+    """Process-wide LRU of built figures; they are never mutated after construction."""
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, builder, *args):
+        """``builder(*args)``, built once per distinct data and options; recorded as a "figure" span."""
+        with instrumentation.span(builder.__name__, "figure") as span:
+            key = fingerprint(f"{builder.__module__}.{builder.__qualname__}", *args)
+            with self._lock:
+                if key in self._figures:
+                    self._figures.move_to_end(key)
+                    span["cache"] = "memory"
+                    return self._figures[key]
+            span["cache"] = "miss"
+            built = builder(*args)
+        with self._lock:
+            self._figures[key] = built
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return built
+
+
+def chart_timeframe(start_date, end_date, timeframe, max_buckets):
+    """``timeframe``, or the next coarser one that fits ``[start_date, end_date]`` in ``max_buckets`` bars per series."""
+    candidates = transfers.TIMEFRAMES[transfers.TIMEFRAMES.index(timeframe):]
+    for candidate in candidates:
+        if transfers.bucket_count(start_date, end_date, candidate) <= max_buckets:
+            return candidate
+    return candidates[-1]
+
+
+def _wide(df, index, columns, values, order):
+    """``index x columns`` pivot of every ``values`` column at once, series in ``order``."""
+    pivot = df.pivot_table(index=index, columns=columns, values=values, aggfunc="sum", sort=True)
+    if pivot.empty:
+        # No rows in the range (e.g. a "Last 7 Days" preset without transfers): empty charts, not a KeyError.
+        return {value: pd.DataFrame(columns=order, dtype="float64") for value in values}
+    return {value: pivot[value].reindex(columns=order) for value in values}
+
+
+def _sequence(names, colors):
+    return {name: colors[i % len(colors)] for i, name in enumerate(names)}
+
+
+# --- Row 2, 3 ------------------------------------------------------------------------------------------------------
+def timeseries_figures(df_timeseries, path_colors, symbol=SYMBOL):
+    """Counts, USD volume, senders and volume share by path over time; ``path_colors`` is keyed by lowercase path.
+
+    Paths without a color of their own (routes of other tokens) take the default sequence.
+    """
+    paths = list(df_timeseries["path"].unique())
+    wide = _wide(
+        df_timeseries, "date", "path",
+        ["transfers_count", "transfers_volume_usd", "senders_count", "transfers_volume_ath"], paths,
+    )
+    sequence = _sequence(paths, PATH_SEQUENCE)
+
+    def stacked_with_total(measure, total_name, title, yaxis_title):
+        data = wide[measure]
+        fig = go.Figure([
+            go.Bar(x=data.index, y=data[path], name=path, marker_color=path_colors.get(path.lower(), sequence[path]))
+            for path in paths
+        ])
+        fig.add_trace(go.Scatter(
+            x=data.index, y=data.sum(axis=1), mode="lines+markers", name=total_name, line=dict(color="black", width=3),
+        ))
+        fig.update_layout(barmode="stack", title=title, xaxis_title="Date", yaxis_title=yaxis_title, legend=_LEGEND_TOP)
+        return fig
+
+    def stacked(data, title, yaxis_title, **layout):
+        fig = go.Figure([
+            go.Bar(x=data.index, y=data[path], name=path, marker_color=sequence[path]) for path in paths
+        ])
+        fig.update_layout(barmode="stack", title=title, xaxis_title="Date", yaxis_title=yaxis_title, legend=_LEGEND_TOP, **layout)
+        return fig
+
+    volume = wide["transfers_volume_ath"]
+    return (
+        stacked_with_total("transfers_count", "Total Transfers Count", "Number of Interchain Transfers By Path Over Time", "Txns Count"),
+        stacked_with_total("transfers_volume_usd", "Total Transfers Volume", "Volume of Interchain Transfers By Path Over Time", "$USD"),
+        stacked(wide["senders_count"], f"Number of ${symbol} Senders Over Time", "Address count"),
+        stacked(
+            volume.div(volume.sum(axis=1), axis=0),
+            "Share of Each Route from the Total Volume of Transfers", "% of Volume", yaxis_tickformat=".0%",
+        ),
+    )
+
+
+# --- Row 4 ---------------------------------------------------------------------------------------------------------
+def path_donuts(df_path_summary, symbol=SYMBOL):
+    """Transfers, token volume and USD volume by path."""
+    colors = list(_sequence(df_path_summary["path"], PATH_SEQUENCE).values())
+
+    def donut(values, title):
+        fig = go.Figure(go.Pie(
+            labels=df_path_summary["path"], values=df_path_summary[values], hole=0.4, marker_colors=colors,
+        ))
+        fig.update_layout(title=title)
+        return fig
+
+    return (
+        donut("transfers_count", "Total Number of Interchain Transfers By Path"),
+        donut("transfers_volume_ath", f"Total Volume of Interchain Transfers By Path (${symbol})"),
+        donut("transfers_volume_usd", "Total Volume of Interchain Transfers By Path ($USD)"),
+    )
+
+
+# --- Row 5 ---------------------------------------------------------------------------------------------------------
+def volume_distribution_figures(df_volume_distribution, df_volume_distribution_total, class_colors):
+    """100% stacked size classes over time and the overall class donut; ``class_colors`` also sets the class order."""
+    classes = [name for name in class_colors if name in set(df_volume_distribution["Class"])]
+    counts = _wide(df_volume_distribution, "Date", "Class", ["Transfers Count"], classes)["Transfers Count"]
+    shares = counts.div(counts.sum(axis=1), axis=0)
+    fig_norm_stacked = go.Figure([
+        go.Bar(
+            x=shares.index, y=shares[name], name=name, marker_color=class_colors[name],
+            text=counts[name].astype("Int64").astype(str).where(counts[name].notna(), ""), textposition="inside",
+        )
+        for name in classes
+    ])
+    fig_norm_stacked.update_layout(
+        barmode="stack", title="Distribution of Interchain Transfers Based on Volume Over Time",
+        xaxis_title="Date", yaxis_title="normalized", yaxis_tickformat="%", legend_title_text="Class",
+    )
+
+    fig_donut_volume = go.Figure(go.Pie(
+        labels=df_volume_distribution_total["Class"],
+        values=df_volume_distribution_total["Transfers Count"],
+        hole=0.5,
+        marker_colors=[class_colors.get(name) for name in df_volume_distribution_total["Class"]],
+        textposition="outside",
+        textinfo="percent+label",
+        pull=[0.05] * len(df_volume_distribution_total),
+    ))
+    fig_donut_volume.update_layout(
+        title="Distribution of Interchain Transfers Based on Volume",
+        showlegend=True, legend=dict(orientation="v", y=0.5, x=1.1),
+    )
+    return fig_norm_stacked, fig_donut_volume
+
+
+# --- Row 7 ---------------------------------------------------------------------------------------------------------
+def weekly_figures(weekly_data, symbol=SYMBOL):
+    """Volume, and transfers next to senders, by day of the week."""
+    bar_fig = go.Figure(go.Bar(x=weekly_data["Day Name"], y=weekly_data["Transfers Volume ATH"], marker_color="#d9fd51"))
+    bar_fig.update_layout(
+        title="Volume of Interchain Transfers on Different Days of the Week",
+        xaxis_title=" ", yaxis_title=f"${symbol}", bargap=0.2,
+    )
+
+    clustered_fig = go.Figure([
+        go.Bar(x=weekly_data["Day Name"], y=weekly_data["Transfers Count"], name="Transfers Count", marker_color="#d9fd51"),
+        go.Bar(x=weekly_data["Day Name"], y=weekly_data["Users Count"], name="Users Count", marker_color="#cd00fc"),
+    ])
+    clustered_fig.update_layout(
+        barmode="group",
+        title="Number of Interchain Transfers & Senders on Different Days of the Week",
+        xaxis_title=" ", yaxis_title=" ", bargap=0.2, legend=_LEGEND_TOP,
+    )
+    return bar_fig, clustered_fig
+
+
+# --- Row 8 ---------------------------------------------------------------------------------------------------------
+def seasonality_measures(symbol=SYMBOL):
+    """``{column: label}`` of the measures a seasonality chart can show."""
+    return {
+        "transfers_count": "Transfers",
+        "transfers_volume_ath": f"Volume (${symbol})",
+        "transfers_volume_usd": "Volume ($USD)",
+        "senders_count": "Senders",
+    }
+
+
+def seasonality_figures(df_weekday_hour, df_hour_of_day, column, symbol=SYMBOL):
+    """Weekday x hour heatmap and hour-of-day bars of one measure column of :func:`seasonality_measures`."""
+    label = seasonality_measures(symbol)[column]
+    matrix = df_weekday_hour[column].to_numpy().reshape(7, seasonality.HOURS)
+    heatmap = go.Figure(go.Heatmap(
+        z=matrix, x=list(range(seasonality.HOURS)), y=seasonality.WEEKDAYS,
+        colorscale=[[0, PATH_SEQUENCE[1]], [1, PATH_SEQUENCE[0]]], colorbar_title_text=label,
+        hovertemplate="%{y} %{x}:00 UTC<br>%{z:,.0f}<extra></extra>",
+    ))
+    heatmap.update_layout(
+        title=f"{label} by Day of the Week and Hour (UTC)",
+        xaxis_title="Hour of day (UTC)", yaxis_autorange="reversed", xaxis_dtick=2,
+    )
+
+    bar_fig = go.Figure(go.Bar(x=df_hour_of_day["hour"], y=df_hour_of_day[column], marker_color=PATH_SEQUENCE[0]))
+    bar_fig.update_layout(
+        title=f"{label} by Hour of the Day (UTC)", xaxis_title="Hour of day (UTC)", yaxis_title=label,
+        xaxis_dtick=2, bargap=0.2,
+    )
+    return heatmap, bar_fig
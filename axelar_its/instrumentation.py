@@ -0,0 +1,146 @@
+"""Timing spans for panel loaders, warehouse queries, figure builds and renders.
+
+Code under measurement opens a :func:`span`; when it closes, the span's wall
+time and whatever was attached to it - cache tier, rows, bytes, Snowflake
+query id - is recorded three ways: appended to the spans of the current
+script run (:func:`collect`, shown in the dashboard's developer sidebar),
+logged as one JSON object per span on the ``axelar_its.instrumentation``
+logger, and added to process-wide totals that :meth:`Recorder.prometheus`
+renders in the Prometheus text format. Spans nest through a context
+variable, so a query records the loader it ran under as its parent; worker
+threads see the run's spans when they are started in a copy of the
+submitting context (``contextvars.copy_context().run``).
+"""
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_collector = contextvars.ContextVar("instrumentation_collector", default=None)
+_current = contextvars.ContextVar("instrumentation_span", default=None)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def size_of(value):
+    """``(rows, bytes)`` of a loader result: frames and series, or tuples of them."""
+    if isinstance(value, pd.DataFrame):
+        return len(value), int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return len(value), int(value.memory_usage(deep=True))
+    if isinstance(value, (list, tuple)):
+        rows = bytes_ = 0
+        for item in value:
+            item_rows, item_bytes = size_of(item)
+            rows += item_rows
+            bytes_ += item_bytes
+        return rows, bytes_
+    return 0, 0
+
+
+class Recorder:
+    def __init__(self, history=500):
+        self.recent = deque(maxlen=history)
+        self._totals = defaultdict(lambda: [0, 0.0, 0, 0])  # (kind, name, cache) -> [count, seconds, rows, bytes]
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, kind, **fields):
+        """Time the block; the yielded dict takes ``cache``, ``rows``, ``bytes``, ``query_id`` or any other field."""
+        parent = _current.get()
+        span = {
+            "name": name, "kind": kind, "parent": parent["name"] if parent else None,
+            "cache": None, "rows": None, "bytes": None, "query_id": None, **fields,
+        }
+        token = _current.set(span)
+        span["started_at"] = time.time()
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as exc:
+            span["error"] = type(exc).__name__
+            raise
+        finally:
+            span["seconds"] = time.perf_counter() - started
+            _current.reset(token)
+            self._record(span)
+
+    def _record(self, span):
+        with self._lock:
+            self.recent.append(span)
+            totals = self._totals[(span["kind"], span["name"], span["cache"] or "")]
+            totals[0] += 1
+            totals[1] += span["seconds"]
+            totals[2] += span["rows"] or 0
+            totals[3] += span["bytes"] or 0
+        collector = _collector.get()
+        if collector is not None:
+            collector.append(span)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(span, default=str))
+
+    def prometheus(self):
+        """Totals since process start in the Prometheus text exposition format."""
+        with self._lock:
+            totals = sorted(self._totals.items())
+        lines = []
+        for metric, kind, help_text, column in (
+            ("axelar_its_span_seconds", "summary", "Wall time of instrumented spans.", None),
+            ("axelar_its_span_rows_total", "counter", "Rows returned by instrumented spans.", 2),
+            ("axelar_its_span_bytes_total", "counter", "Bytes returned or transferred by instrumented spans.", 3),
+        ):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            for (span_kind, name, cache), values in totals:
+                labels = f'kind="{_label(span_kind)}",name="{_label(name)}",cache="{_label(cache)}"'
+                if column is None:
+                    lines.append(f"{metric}_sum{{{labels}}} {values[1]:.6f}")
+                    lines.append(f"{metric}_count{{{labels}}} {values[0]}")
+                else:
+                    lines.append(f"{metric}{{{labels}}} {values[column]}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Atomically write :meth:`prometheus` to ``path`` (e.g. for node_exporter's textfile collector)."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
+
+
+RECORDER = Recorder()
+span = RECORDER.span
+
+
+def annotate(**fields):
+    """Set fields on the innermost open span unless they are set already.
+
+    The first cache lookup under a loader is the loader's own; chunk lookups made while computing it do not
+    overwrite its hit or miss.
+    """
+    current = _current.get()
+    if current is not None:
+        for key, value in fields.items():
+            if current.get(key) is None:
+                current[key] = value
+
+
+@contextmanager
+def collect():
+    """Collect the spans closed in this context (and contexts copied from it) into the yielded list."""
+    spans = []
+    token = _collector.set(spans)
+    try:
+        yield spans
+    finally:
+        _collector.reset(token)
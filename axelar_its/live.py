@@ -0,0 +1,128 @@
+"""Live tail: KPIs and the latest chart buckets of a range that ends now, kept current by deltas.
+
+A :class:`LiveTail` is seeded once from the rollup cube of ``[start_date,
+today]`` and the key of the newest stored row. Every tick then runs one
+small query - :func:`transfers.load_transfers_after` that key - and folds
+the returned rows into running sums, a merged sender sketch and the per
+(bucket, path) sketches of the latest timeseries buckets, so no tick
+recomputes anything over the range. New rows are also kept, newest first,
+for the tracker table.
+
+The tail only sees rows newer than its key. Rows the warehouse backfills
+with an older ``created_at`` reach the panels with the next store sync
+(see :attr:`TransferStore.recheck`), not through the tail.
+"""
+
+import threading
+import time
+
+import pandas as pd
+
+from axelar_its import sketches, transfers
+from axelar_its.prices import PriceTable
+from axelar_its.sql import SYMBOL
+
+
+class LiveTail:
+    def __init__(self, view, timeframe, watermark, make_sketch, max_rows=200, symbol=SYMBOL, prices=None):
+        """
+        view:        :class:`~axelar_its.rollup.RollupView` of the range up to the newest stored row
+        timeframe:   bucket size of :meth:`timeseries`
+        watermark:   ``(created_at, tx_id)`` of the newest row ``view`` includes
+        make_sketch: sender sketch builder of the cube, see :func:`~axelar_its.sketches.sketch_factory`
+        max_rows:    how many of the newest tailed rows :attr:`rows` keeps
+        symbol:      the token tailed
+        prices:      :class:`~axelar_its.prices.PriceTable` the new rows are priced with, as the cube's were
+        """
+        self.symbol = symbol
+        self.prices = prices if prices is not None else PriceTable()
+        self.timeframe = timeframe
+        self.watermark = watermark
+        self.make_sketch = make_sketch
+        self.max_rows = max_rows
+        measures = view.measures
+        self.volume_ath = float(measures["transfers_volume_ath"].sum())
+        self.volume_usd = float(measures["transfers_volume_usd"].sum())
+        self.count = int(measures["transfers_count"].sum())
+        self.senders = sketches.merge_all(view.senders["senders"])
+        # Unrounded volumes: rounding each tick would drift them; timeseries() rounds once.
+        self._timeseries = view.timeseries_sums(timeframe).set_index(["date", "path"])
+        # Sender sketches of the latest bucket per path: the only buckets new rows can still land in.
+        routed = transfers.routed(view.senders)
+        bucket = transfers.truncate(routed["day"], timeframe)
+        latest = routed[bucket == bucket.max()] if not routed.empty else routed
+        self._bucket_senders = {
+            key: sketches.merge_all(group["senders"])
+            for key, group in latest.groupby([transfers.truncate(latest["day"], timeframe), transfers.path_of(latest)])
+        }
+        self.rows = pd.DataFrame()
+        self.added = 0
+        self.polled_at = None
+        self._lock = threading.Lock()
+
+    def poll(self, run, min_interval=0):
+        """Fetch and fold the rows after the watermark through ``run(fn(conn))``; returns how many arrived.
+
+        Ticks closer than ``min_interval`` seconds to the previous one return 0 without a query, so
+        several fragments may tick the same tail.
+        """
+        with self._lock:
+            if self.polled_at is not None and time.monotonic() - self.polled_at < min_interval:
+                return 0
+            delta = run(lambda conn: transfers.load_transfers_after(conn, *self.watermark, symbols=self.symbol))
+            self.polled_at = time.monotonic()
+            self.fold(delta)
+            return len(delta)
+
+    def fold(self, delta):
+        if delta.empty:
+            return
+        delta = self.prices.apply(delta.assign(created_at=pd.to_datetime(delta["created_at"])), self.symbol)
+        delta = delta.sort_values(["created_at", "tx_id"])
+        self.volume_ath += float(delta["amount"].sum())
+        self.volume_usd += float(delta["amount_usd"].sum())
+        self.count += len(delta)
+        new_senders = self.make_sketch(delta["sender_address"])
+        self.senders = new_senders if self.senders is None else self.senders.merge(new_senders)
+
+        routed = transfers.routed(delta)
+        if not routed.empty:
+            routed = routed.assign(date=transfers.truncate(routed["created_at"], self.timeframe), path=transfers.path_of(routed))
+            timeseries = self._timeseries
+            for key, rows in routed.groupby(["date", "path"]):
+                sketch = self.make_sketch(rows["sender_address"])
+                if key in self._bucket_senders:
+                    sketch = self._bucket_senders[key].merge(sketch)
+                self._bucket_senders[key] = sketch
+                previous = timeseries.loc[key] if key in timeseries.index else None
+                timeseries.loc[key, ["transfers_volume_ath", "transfers_volume_usd", "transfers_count", "senders_count"]] = [
+                    (0 if previous is None else previous["transfers_volume_ath"]) + rows["amount"].sum(),
+                    (0 if previous is None else previous["transfers_volume_usd"]) + rows["amount_usd"].sum(),
+                    (0 if previous is None else previous["transfers_count"]) + len(rows),
+                    sketch.count(),
+                ]
+            latest = routed["date"].max()
+            self._bucket_senders = {key: sketch for key, sketch in self._bucket_senders.items() if key[0] >= latest}
+
+        last = delta.iloc[-1]
+        self.watermark = (last["created_at"], last["tx_id"])
+        self.rows = pd.concat([delta.iloc[::-1], self.rows], ignore_index=True).head(self.max_rows)
+        self.added += len(delta)
+
+    # --- Panels -------------------------------------------------------------------------------------------------
+    def metrics(self):
+        """Same shape as :meth:`RollupView.metrics <axelar_its.rollup.RollupView.metrics>`."""
+        return pd.Series({
+            "transfers_volume_ath": round(self.volume_ath),
+            "transfers_volume_usd": round(self.volume_usd),
+            "transfers_count": self.count,
+            "senders_count": 0 if self.senders is None else self.senders.count(),
+        })
+
+    def timeseries(self):
+        """Same shape as :meth:`RollupView.timeseries <axelar_its.rollup.RollupView.timeseries>`."""
+        out = self._timeseries.reset_index()
+        out[["transfers_volume_ath", "transfers_volume_usd"]] = out[["transfers_volume_ath", "transfers_volume_usd"]].round()
+        out["transfers_count"] = out["transfers_count"].astype("int64")
+        out["senders_count"] = out["senders_count"].astype("int64")
+        return out.sort_values(["date", "path"], ignore_index=True)
@@ -0,0 +1,94 @@
+"""Panel datasets of the dashboard, cached under keys the precompute worker shares.
+
+A panel is cached by ``(token, name, start_date, end_date, timeframe)`` in
+the settings namespace - not by the loader function that happens to compute it -
+so ``precompute_worker.py`` can fill the cache for the :func:`presets` and the
+dashboard finds the finished result under the same key. Dates are normalized
+to days first: a ``date`` from a widget and a ``Timestamp`` from the worker
+land on one entry.
+"""
+
+from datetime import date
+
+import pandas as pd
+
+from axelar_its import figures, transfers
+from axelar_its.cache import fingerprint
+from axelar_its.sql import SYMBOL
+
+DEFAULT_RANGE = (date(2024, 6, 10), date(2025, 7, 31))
+
+# name -> (takes a timeframe, dataset of a RollupView)
+PANELS = {
+    "metrics": (False, lambda view, _: view.metrics()),
+    "timeseries": (True, lambda view, tf: view.timeseries(tf)),
+    "path_summary": (False, lambda view, _: view.path_summary()),
+    "volume_distribution": (True, lambda view, tf: view.volume_distribution(tf)),
+    "volume_distribution_total": (False, lambda view, _: view.volume_distribution_total()),
+    "weekly_breakdown": (False, lambda view, _: view.weekly_breakdown()),
+    "weekday_hour": (False, lambda view, _: view.weekday_hour()),
+    "hour_of_day": (False, lambda view, _: view.hour_of_day()),
+}
+
+
+def _day(value):
+    return pd.Timestamp(value).date()
+
+
+def presets(today=None, first_day=None):
+    """``{label: (start_date, end_date)}`` offered by the dashboard and warmed by the worker.
+
+    "All Time" starts at ``first_day`` (the oldest stored transfer) and is left out while it is unknown.
+    """
+    today = _day(today if today is not None else pd.Timestamp.now())
+    ranges = {"Default Range": DEFAULT_RANGE}
+    for days in (7, 30, 90):
+        ranges[f"Last {days} Days"] = (today - pd.Timedelta(days=days - 1).to_pytimedelta(), today)
+    if first_day is not None:
+        ranges["All Time"] = (_day(first_day), today)
+    return ranges
+
+
+def chart_timeframes(start_date, end_date, max_buckets):
+    """Distinct timeframes the charts of ``[start_date, end_date]`` are drawn at, over every selectable one."""
+    return sorted(
+        {figures.chart_timeframe(start_date, end_date, timeframe, max_buckets) for timeframe in transfers.TIMEFRAMES},
+        key=transfers.TIMEFRAMES.index,
+    )
+
+
+class PanelService:
+    def __init__(self, cache, planners):
+        """
+        cache:    the :class:`~axelar_its.cache.TwoTierCache` holding the panels of every token
+        planners: ``{symbol: RangePlanner}`` computing missing panels from each token's rollup chunks
+        """
+        self.cache = cache
+        self.planners = planners
+
+    def _key(self, symbol, name, start, end, timeframe):
+        # The planner namespace holds the settings namespace, the token and its size classes.
+        return fingerprint("panel", self.planners[symbol].namespace, name, start, end, timeframe)
+
+    def _arguments(self, name, start_date, end_date, timeframe):
+        by_timeframe, _ = PANELS[name]
+        return _day(start_date), _day(end_date), timeframe if by_timeframe else None
+
+    def load(self, name, start_date, end_date, timeframe=None, symbol=SYMBOL):
+        """The ``name`` panel of ``symbol`` in ``[start_date, end_date]``, computed only on a cache miss."""
+        start, end, timeframe = self._arguments(name, start_date, end_date, timeframe)
+        return self.cache.get_or_compute(
+            self._key(symbol, name, start, end, timeframe),
+            lambda: PANELS[name][1](self.planners[symbol].view(start, end), timeframe),
+            ttl=self.cache.ttl_for({"end_date": end, "symbol": symbol}),
+        )
+
+    def refresh(self, name, start_date, end_date, timeframe=None, symbol=SYMBOL, refresh_from=None, ttl=None):
+        """Recompute the panel - rebuilding rollup chunks from ``refresh_from`` on - and replace the cached one."""
+        start, end, timeframe = self._arguments(name, start_date, end_date, timeframe)
+        value = PANELS[name][1](self.planners[symbol].view(start, end, refresh_from=refresh_from), timeframe)
+        self.cache.put(
+            self._key(symbol, name, start, end, timeframe), value,
+            ttl=ttl if ttl is not None else self.cache.ttl_for({"end_date": end, "symbol": symbol}),
+        )
+        return value
@@ -0,0 +1,102 @@
+"""Answer any date range from cached per-month rollup chunks.
+
+Caching panels by the exact ``(start_date, end_date)`` pair throws all reuse
+away as soon as one end moves by a day. The planner instead splits a range
+into aligned chunks - whole calendar months, plus single days for the partial
+months at either edge - and caches the day-level cube of each chunk on its
+own. Only the chunks missing from the cache are built, and since every cube
+measure is a sum and every sender sketch merges, the final range is just the
+concatenation of its chunks. Overlapping ranges picked by different users
+share all of their whole months.
+"""
+
+import threading
+
+import pandas as pd
+
+from axelar_its import buckets, rollup
+from axelar_its.cache import fingerprint
+from axelar_its.rollup import RollupView
+
+
+def split_range(start_date, end_date):
+    """Aligned ``(first_day, last_day)`` chunks covering ``[start_date, end_date]``."""
+    day, end = pd.Timestamp(start_date).normalize(), pd.Timestamp(end_date).normalize()
+    chunks = []
+    while day <= end:
+        month_end = day + pd.offsets.MonthEnd(0)
+        if day.day == 1 and month_end <= end:
+            chunks.append((day, month_end))
+            day = month_end + pd.Timedelta(days=1)
+        else:
+            chunks.append((day, day))
+            day += pd.Timedelta(days=1)
+    return chunks
+
+
+def _runs(chunks):
+    """Group chunks into runs of adjacent ones, so each run is built from a single read."""
+    runs = []
+    for chunk in chunks:
+        if runs and runs[-1][-1][1] + pd.Timedelta(days=1) == chunk[0]:
+            runs[-1].append(chunk)
+        else:
+            runs.append([chunk])
+    return runs
+
+
+class RangePlanner:
+    def __init__(self, cache, read_rows, make_sketch, namespace="rollup", size_classes=buckets.DEFAULT, symbol=None):
+        """
+        cache:        a :class:`~axelar_its.cache.TwoTierCache`; its TTL policy sees each chunk's ``end_date``
+        read_rows:    ``(start_date, end_date) -> extract rows``, called only for missing chunks
+        make_sketch:  sender sketch builder, see :func:`~axelar_its.sketches.sketch_factory`
+        namespace:    part of every chunk key; change it whenever the cube layout or sketch kind changes
+        size_classes: the :class:`~axelar_its.buckets.SizeClasses` of the cube; their boundaries are part of the key
+        symbol:       token of the rows, passed to the TTL policy with each chunk's ``end_date``
+        """
+        self.cache = cache
+        self.read_rows = read_rows
+        self.make_sketch = make_sketch
+        self.namespace = f"{namespace}:{size_classes.key}"
+        self.size_classes = size_classes
+        self.symbol = symbol
+        self._build_lock = threading.Lock()
+
+    def _key(self, chunk):
+        return fingerprint(self.namespace, *chunk)
+
+    def view(self, start_date, end_date, refresh_from=None):
+        """The merged cube for ``[start_date, end_date]``, building only uncached chunks.
+
+        Chunks ending on or after ``refresh_from`` are rebuilt and replaced in the cache even when cached, so a
+        view taken right after a store sync reflects it.
+        """
+        chunks = split_range(start_date, end_date)
+        if not chunks:
+            rows = self.read_rows(pd.Timestamp(start_date), pd.Timestamp(end_date))
+            return RollupView(*rollup.build(rows, self.make_sketch, self.size_classes))
+        stale = set() if refresh_from is None else {
+            chunk for chunk in chunks if chunk[1] >= pd.Timestamp(refresh_from).normalize()
+        }
+        cubes = {chunk: None if chunk in stale else self.cache.get(self._key(chunk)) for chunk in chunks}
+        if any(cube is None for cube in cubes.values()):
+            # Panels load concurrently and usually miss the same chunks: build them once.
+            with self._build_lock:
+                self._build_missing(cubes, stale)
+        return RollupView.concat(cubes[chunk] for chunk in chunks)
+
+    def _build_missing(self, cubes, stale=()):
+        for chunk, cube in cubes.items():
+            if cube is None and chunk not in stale:
+                cubes[chunk] = self.cache.get(self._key(chunk))
+        for run in _runs([chunk for chunk, cube in cubes.items() if cube is None]):
+            built = rollup.build(self.read_rows(run[0][0], run[-1][1]), self.make_sketch, self.size_classes)
+            for chunk in run:
+                part = rollup.between(built, *chunk)
+                ttl = self.cache.ttl_for({"end_date": chunk[1], "symbol": self.symbol})
+                if chunk in stale:
+                    self.cache.put(self._key(chunk), part, ttl=ttl)
+                    cubes[chunk] = part
+                else:
+                    cubes[chunk] = self.cache.get_or_compute(self._key(chunk), lambda part=part: part, ttl=ttl)
@@ -0,0 +1,124 @@
+"""Daily USD price table and the as-of join that prices transfer rows.
+
+The extract carries the warehouse's own USD inputs - the oracle ``value`` of
+a transfer, the gas used and the source gas token with its oracle rate, the
+express fee - and :meth:`PriceTable.apply` turns them into ``amount_usd`` and
+``fee`` in one vectorized pass. Where the table holds a price for the token
+(or gas token) of a row, as of its ``created_at``, that price wins;
+elsewhere the oracle value is used. The table is seeded with the ATH launch
+price for the days the oracle had none, and a CSV or Parquet file of
+``day, symbol, usd`` rows (``[prices] path``) extends or overrides it. A
+price holds until the next row of its symbol, at most :attr:`max_age`; a row
+with an empty ``usd`` ends it early.
+
+USD columns are derived when rows are read, not stored, so a new price file
+re-prices every panel from the local store without a warehouse query: its
+:attr:`PriceTable.version` is part of the cache namespace.
+"""
+
+import os
+from datetime import timedelta
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from axelar_its.cache import fingerprint
+from axelar_its.sql import SYMBOL
+
+# ATH launch days: the oracle had no price yet, so transfers are valued at the launch price.
+LAUNCH_PRICES = [
+    ("2024-06-10", "ATH", 0.084486),
+    ("2024-06-11", "ATH", 0.084486),
+    ("2024-06-12", "ATH", 0.084486),
+    ("2024-06-13", "ATH", None),
+]
+DEFAULT_MAX_AGE = timedelta(days=2)
+
+# Extract columns the USD columns are derived from, dropped once they are.
+INPUTS = ["value_usd", "gas_used", "gas_symbol", "gas_price_usd", "express_fee_usd"]
+
+
+def _frame(rows):
+    df = pd.DataFrame(rows, columns=["day", "symbol", "usd"])
+    return pd.DataFrame({
+        "day": pd.to_datetime(df["day"]).astype("datetime64[ns]"),
+        "symbol": pd.Series(df["symbol"].to_numpy(dtype=object), dtype=object),
+        "usd": pd.to_numeric(df["usd"]).astype("float64"),
+    })
+
+
+@lru_cache(maxsize=4)
+def _read(path, mtime):
+    """The ``day, symbol, usd`` rows of ``path``; ``mtime`` keys the cache, so an edited file is read again."""
+    df = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+    return _frame(df[["day", "symbol", "usd"]])
+
+
+class PriceTable:
+    def __init__(self, prices=None, max_age=DEFAULT_MAX_AGE):
+        """
+        prices:  ``day, symbol, usd`` rows, on top of :data:`LAUNCH_PRICES` (a row of the same day and symbol wins)
+        max_age: how long a price holds without a newer row of its symbol
+        """
+        table = _frame(LAUNCH_PRICES)
+        if prices is not None:
+            table = pd.concat([table, _frame(prices)], ignore_index=True)
+        self.table = (
+            table.drop_duplicates(["day", "symbol"], keep="last")
+            .sort_values(["day", "symbol"], ignore_index=True)
+        )
+        self.max_age = pd.Timedelta(max_age)
+
+    @classmethod
+    def load(cls, path=None, max_age=DEFAULT_MAX_AGE):
+        """The table of the file at ``path``; just the seed prices when there is none."""
+        if not path or not os.path.exists(path):
+            return cls(max_age=max_age)
+        return cls(_read(path, os.path.getmtime(path)), max_age=max_age)
+
+    @property
+    def version(self):
+        """Short digest of the prices, for cache namespaces."""
+        return fingerprint(self.table, str(self.max_age))[:12]
+
+    def lookup(self, symbols, at):
+        """Price of each ``symbols[i]`` as of ``at[i]`` (NaN where the table has none), in input order."""
+        rows = pd.DataFrame({
+            "at": pd.to_datetime(pd.Series(at)).astype("datetime64[ns]").to_numpy(),
+            "symbol": pd.Series(np.asarray(symbols, dtype=object), dtype=object),
+            "row": np.arange(len(at)),
+        })
+        if rows.empty or self.table.empty:
+            return np.full(len(rows), np.nan)
+        matched = pd.merge_asof(
+            rows.dropna(subset=["at"]).sort_values("at", kind="stable"), self.table,
+            left_on="at", right_on="day", by="symbol", direction="backward", tolerance=self.max_age,
+        )
+        prices = np.full(len(rows), np.nan)
+        prices[matched["row"].to_numpy()] = matched["usd"].to_numpy()
+        return prices
+
+    def apply(self, df, symbol=SYMBOL):
+        """``df`` with ``amount_usd`` and ``fee`` derived from its :data:`INPUTS`, which are dropped.
+
+        The token of a row is its ``symbol`` column, or ``symbol`` for rows without one (store partitions).
+        Frames without the inputs (already priced) are returned as they are.
+        """
+        if "value_usd" not in df:
+            return df
+        tokens = df["symbol"] if "symbol" in df else np.full(len(df), symbol, dtype=object)
+        price = self.lookup(tokens, df["created_at"])
+        amount = df["amount"].to_numpy(dtype="float64", na_value=np.nan)
+        amount_usd = np.where(np.isnan(price), df["value_usd"].to_numpy(dtype="float64", na_value=np.nan), amount * price)
+
+        gas_price = self.lookup(df["gas_symbol"], df["created_at"])
+        gas_price = np.where(np.isnan(gas_price), df["gas_price_usd"].to_numpy(dtype="float64", na_value=np.nan), gas_price)
+        fee = df["gas_used"].to_numpy(dtype="float64", na_value=np.nan) * gas_price
+        fee = np.where(np.isnan(fee), df["express_fee_usd"].to_numpy(dtype="float64", na_value=np.nan), fee)
+
+        priced = df.drop(columns=INPUTS)
+        position = priced.columns.get_loc("amount") + 1
+        priced.insert(position, "amount_usd", amount_usd)
+        priced.insert(position + 1, "fee", fee)
+        return priced
@@ -0,0 +1,162 @@
+"""Day-level rollup cube behind the aggregate panels.
+
+``measures`` holds the additive columns keyed by (day, source_chain,
+destination_chain, size_class). Distinct senders are not additive, so they are
+kept next to it as one mergeable sketch per (day, source_chain,
+destination_chain) in ``senders`` - exact sets or HyperLogLog, see
+:mod:`axelar_its.sketches`. ``hours`` holds volume, count and a sender sketch
+per (day, hour of day) for the weekday and intraday views of
+:mod:`axelar_its.seasonality`. Week and month views are produced by rolling
+the cube up in memory, so switching the timeframe never reaches the
+warehouse, and cubes of adjacent ranges simply concatenate (see
+:mod:`axelar_its.planner`).
+"""
+
+import pandas as pd
+
+from axelar_its import buckets, compact, seasonality, sketches, transfers
+
+# Bump when a roll-up changes its result for the same cube, so cached panels are not served.
+VERSION = 3
+
+ROUTE = ["source_chain", "destination_chain"]
+MEASURE_KEY = ["day", *ROUTE, "size_class"]
+SENDER_KEY = ["day", *ROUTE]
+HOUR_KEY = ["day", "hour"]
+
+
+def build(rows, make_sketch=sketches.ExactSketch.from_values, size_classes=buckets.DEFAULT):
+    """Aggregate extract rows into ``(measures, senders, hours)`` day-level frames."""
+    rows = rows.assign(
+        day=rows["created_at"].dt.floor("D"),
+        hour=rows["created_at"].dt.hour.astype("int8"),
+        size_class=size_classes.assign(rows["amount"]),
+        # Compact rows may hold float32 USD amounts; sums are taken in double precision.
+        amount=rows["amount"].astype("float64"),
+        amount_usd=rows["amount_usd"].astype("float64"),
+    )
+    measures = (
+        rows.groupby(MEASURE_KEY, dropna=False, observed=True)
+        .agg(
+            transfers_volume_ath=("amount", "sum"),
+            transfers_volume_usd=("amount_usd", "sum"),
+            transfers_count=("tx_id", "size"),
+        )
+        .reset_index()
+    )
+    senders = _with_senders(rows.groupby(SENDER_KEY, dropna=False, observed=True), rows, make_sketch, lambda g: g.size())
+    senders = senders[SENDER_KEY + ["senders"]]
+    hours = _with_senders(
+        rows.groupby(HOUR_KEY, observed=True), rows, make_sketch,
+        lambda g: g.agg(
+            transfers_volume_ath=("amount", "sum"),
+            transfers_volume_usd=("amount_usd", "sum"),
+            transfers_count=("tx_id", "size"),
+        ),
+    )
+    return measures, senders, hours
+
+
+def _with_senders(grouped, rows, make_sketch, aggregate):
+    """``aggregate(grouped)`` as a flat frame with a ``senders`` sketch column, built in one pass over the rows."""
+    out = aggregate(grouped).reset_index()
+    out["senders"] = sketches.group_sketches(make_sketch, grouped.ngroup().to_numpy(), grouped.ngroups, rows["sender_address"])
+    return out
+
+
+def between(cube, start_date, end_date):
+    """The part of a ``(measures, senders, hours)`` cube falling on ``[start_date, end_date]``."""
+    return tuple(
+        frame[(frame["day"] >= pd.Timestamp(start_date)) & (frame["day"] <= pd.Timestamp(end_date))].reset_index(drop=True)
+        for frame in cube
+    )
+
+
+class RollupView:
+    def __init__(self, measures, senders, hours):
+        self.measures = measures
+        self.senders = senders
+        self.hours = hours
+
+    @classmethod
+    def concat(cls, cubes):
+        """Merge the ``(measures, senders, hours)`` cubes of disjoint day ranges."""
+        cubes = list(cubes)
+        # Chunks have their own chain dictionaries; re-encode the merged chains as one.
+        return cls(*(
+            compact.compact(pd.concat([cube[i] for cube in cubes], ignore_index=True)) for i in range(3)
+        ))
+
+    # --- Roll-ups -----------------------------------------------------------------------------------------------
+    def metrics(self):
+        """Rounded volumes, ``transfers_count`` and ``senders_count`` of the range; senders from merged sketches."""
+        return pd.Series({
+            "transfers_volume_ath": round(self.measures["transfers_volume_ath"].sum()),
+            "transfers_volume_usd": round(self.measures["transfers_volume_usd"].sum()),
+            "transfers_count": int(self.measures["transfers_count"].sum()),
+            "senders_count": sketches.count_all(self.senders["senders"]),
+        })
+
+    def timeseries(self, timeframe):
+        """Routed ``date, path`` buckets: rounded volumes, ``transfers_count`` and ``senders_count``."""
+        out = self.timeseries_sums(timeframe)
+        out[["transfers_volume_ath", "transfers_volume_usd"]] = out[["transfers_volume_ath", "transfers_volume_usd"]].round()
+        return out
+
+    def timeseries_sums(self, timeframe):
+        """:meth:`timeseries` with unrounded volumes, for running sums that are rounded once at the end."""
+        measures = transfers.routed(self.measures)
+        senders = transfers.routed(self.senders)
+        key = lambda df: [transfers.truncate(df["day"], timeframe).rename("date"), transfers.path_of(df).rename("path")]
+        out = (
+            measures.groupby(key(measures), dropna=False)[
+                ["transfers_volume_ath", "transfers_volume_usd", "transfers_count"]
+            ].sum()
+            .join(senders.groupby(key(senders), dropna=False)["senders"].agg(sketches.count_all).rename("senders_count"))
+            .reset_index()
+        )
+        return out.sort_values("date", ignore_index=True)
+
+    def volume_distribution(self, timeframe):
+        """``Date, Class, Transfers Count`` of routed transfers per ``timeframe`` bucket and size class."""
+        measures = transfers.routed(self.measures)
+        return (
+            measures.groupby(
+                [transfers.truncate(measures["day"], timeframe).rename("Date"), measures["size_class"].rename("Class")],
+                dropna=False,
+            )["transfers_count"].sum()
+            .rename("Transfers Count")
+            .reset_index()
+            .sort_values("Date", ignore_index=True)
+        )
+
+    def volume_distribution_total(self):
+        """``Class, Transfers Count`` of routed transfers over the range."""
+        measures = transfers.routed(self.measures)
+        return (
+            measures.groupby(measures["size_class"].rename("Class"), dropna=False)["transfers_count"].sum()
+            .rename("Transfers Count")
+            .reset_index()
+        )
+
+    def path_summary(self):
+        """Rounded volumes and ``transfers_count`` of routed transfers per ``path``."""
+        measures = transfers.routed(self.measures)
+        out = (
+            measures.groupby(transfers.path_of(measures).rename("path"), dropna=False)[
+                ["transfers_volume_ath", "transfers_volume_usd", "transfers_count"]
+            ].sum()
+            .reset_index()
+        )
+        out[["transfers_volume_ath", "transfers_volume_usd"]] = out[["transfers_volume_ath", "transfers_volume_usd"]].round()
+        return out
+
+    def weekly_breakdown(self):
+        """Row 7 table, see :func:`seasonality.weekly_breakdown`."""
+        return seasonality.weekly_breakdown(self.hours, self.senders)
+
+    def weekday_hour(self):
+        return seasonality.weekday_hour(self.hours)
+
+    def hour_of_day(self):
+        return seasonality.hour_of_day(self.hours)
@@ -0,0 +1,38 @@
+"""Concurrent execution of independent warehouse queries over the connection pool.
+
+Each task is a ``fn(conn)`` callable run on its own pooled connection. At most
+``max_concurrency`` run at once, and results are handed back as they complete,
+so a batch takes roughly as long as its slowest query rather than their sum.
+Tasks run in a copy of the submitter's context, so their instrumentation
+spans belong to the loader that started them.
+"""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class QueryScheduler:
+    def __init__(self, pool, max_concurrency=4):
+        self.pool = pool
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="query")
+
+    def run(self, fn):
+        """Run one task synchronously on the caller's thread."""
+        return self.pool.run(fn)
+
+    def submit(self, fn):
+        return self._executor.submit(contextvars.copy_context().run, self.pool.run, fn)
+
+    def as_completed(self, tasks):
+        """Submit every ``{key: fn}`` task at once and yield ``(key, result)`` in completion order."""
+        futures = {self.submit(fn): key for key, fn in tasks.items()}
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,90 @@
+"""Weekday, hour-of-day and weekday x hour profiles of the ``hours`` rollup frame.
+
+Every (day, hour) row of the cube falls into one of 7 x 24 cells; volumes and
+counts are summed per cell with one ``np.bincount`` each, and the weekday and
+hour profiles are the margins of that matrix. Distinct senders do not add up,
+so the sender sketches of each cell (and each hour) are merged in one k-way
+merge after a single stable sort on the cell number. Weekday senders come from
+the cube's per-day ``senders`` frame instead, which holds far fewer and
+smaller sketches than the hourly one. Hours are those of ``created_at`` (UTC).
+"""
+
+import numpy as np
+import pandas as pd
+
+from axelar_its import sketches
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+HOURS = 24
+# Row 7 labels by ``dayofweek``: Snowflake's ``'1 - Mon'`` .. ``'6 - Sat'``, with Sunday last as ``'7 - Sunday'``.
+DAY_NAMES = ["1 - Mon", "2 - Tue", "3 - Wed", "4 - Thu", "5 - Fri", "6 - Sat", "7 - Sunday"]
+
+MEASURES = ["transfers_volume_ath", "transfers_volume_usd", "transfers_count"]
+
+
+def _cells(hours):
+    """Cell number ``weekday * 24 + hour`` of every row of ``hours``."""
+    return hours["day"].dt.dayofweek.to_numpy(dtype="int64") * HOURS + hours["hour"].to_numpy(dtype="int64")
+
+
+def _sums(groups, hours, size):
+    return {
+        column: np.bincount(groups, weights=hours[column].to_numpy(dtype="float64"), minlength=size)
+        for column in MEASURES
+    }
+
+
+def _distinct(groups, senders, size):
+    """Distinct senders of each of ``size`` groups, merging the sketches of every row in the group."""
+    order = np.argsort(groups, kind="stable")
+    bounds = np.searchsorted(groups[order], np.arange(size + 1))
+    values = senders.to_numpy(dtype=object)[order]
+    return np.array([sketches.count_all(values[lo:hi]) for lo, hi in zip(bounds[:-1], bounds[1:])], dtype="int64")
+
+
+def _profile(groups, hours, size):
+    out = pd.DataFrame(_sums(groups, hours, size))
+    out["transfers_count"] = out["transfers_count"].astype("int64")
+    out["senders_count"] = _distinct(groups, hours["senders"], size)
+    return out
+
+
+def _weekdays(frame):
+    return frame["day"].dt.dayofweek.to_numpy(dtype="int64")
+
+
+def weekday_hour(hours):
+    """168 rows of ``weekday`` (0 = Monday), ``hour`` and the measures and distinct senders of that cell."""
+    cells = _cells(hours)
+    out = _profile(cells, hours, 7 * HOURS)
+    out.insert(0, "weekday", np.repeat(np.arange(7), HOURS))
+    out.insert(1, "hour", np.tile(np.arange(HOURS), 7))
+    return out
+
+
+def hour_of_day(hours):
+    """24 rows of ``hour`` and its measures and distinct senders over every weekday."""
+    out = _profile(hours["hour"].to_numpy(dtype="int64"), hours, HOURS)
+    out.insert(0, "hour", np.arange(HOURS))
+    return out
+
+
+def weekday(hours, senders):
+    """7 rows of ``weekday`` (0 = Monday) and its measures over every hour, with distinct ``senders`` per day."""
+    out = pd.DataFrame(_sums(_weekdays(hours), hours, 7))
+    out["transfers_count"] = out["transfers_count"].astype("int64")
+    out["senders_count"] = _distinct(_weekdays(senders), senders["senders"], 7)
+    out.insert(0, "weekday", np.arange(7))
+    return out
+
+
+def weekly_breakdown(hours, senders):
+    """Row 7 table: ``Day Name`` with its rounded ATH volume, transfer and user counts, for weekdays with transfers."""
+    days = weekday(hours, senders)
+    days = days[days["transfers_count"] > 0]
+    return pd.DataFrame({
+        "Day Name": np.asarray(DAY_NAMES, dtype=object)[days["weekday"].to_numpy()],
+        "Transfers Volume ATH": days["transfers_volume_ath"].round().to_numpy(),
+        "Transfers Count": days["transfers_count"].to_numpy(),
+        "Users Count": days["senders_count"].to_numpy(),
+    })
@@ -0,0 +1,124 @@
+"""Configuration shared by the dashboard and the precompute worker.
+
+Both read the same sections of ``.streamlit/secrets.toml`` - the app through
+``st.secrets``, the worker through :func:`load_secrets` - and build their
+store, cache and planner with the factories below. A panel the worker
+precomputes therefore lands under exactly the cache key the app looks up.
+"""
+
+import tomllib
+from datetime import timedelta
+
+from axelar_its import rollup
+from axelar_its.buckets import DEFAULT_BOUNDARIES, SizeClasses
+from axelar_its.cache import DateRangeTTL, TwoTierCache
+from axelar_its.connection import ConnectionPool, snowflake_connector
+from axelar_its.planner import RangePlanner
+from axelar_its.prices import PriceTable
+from axelar_its.scheduler import QueryScheduler
+from axelar_its.sketches import sketch_factory
+from axelar_its.sql import EXTRACT_VERSION, SYMBOL
+from axelar_its.store import TransferStore
+
+SECRETS_PATH = ".streamlit/secrets.toml"
+
+
+def load_secrets(path=SECRETS_PATH):
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+class Settings:
+    def __init__(self, secrets):
+        self.snowflake = secrets.get("snowflake", {})
+
+        store = secrets.get("store", {})
+        self.store_dir = store.get("path", ".transfer_store")
+        self.recheck = timedelta(hours=store.get("recheck_hours", 48))
+        self.sync_interval = timedelta(minutes=store.get("sync_minutes", 10))
+        # false when a precompute worker keeps the (shared) store in sync: the app then never queries Snowflake
+        self.sync_in_app = store.get("sync_in_app", True)
+        # "exact" keeps sender sets per day and path; "approx" keeps HyperLogLog sketches (~1.6% error at precision 12)
+        self.distinct_mode = store.get("distinct_mode", "exact")
+        self.sketch_precision = store.get("sketch_precision", 12)
+        self.tracker_page_size = store.get("tracker_page_size", 100)
+        self.tracker_cached_pages = store.get("tracker_cached_pages", 16)
+
+        # ITS tokens the store syncs and the dashboard offers; the first is selected by default.
+        self.symbols = list(secrets.get("tokens", {}).get("symbols", [SYMBOL]))
+        # [buckets] boundaries apply to every token unless a [buckets.<SYMBOL>] table overrides them.
+        self._buckets = secrets.get("buckets", {})
+
+        # Daily USD prices of tokens and gas tokens: a "day,symbol,usd" CSV or Parquet file on top of the seed prices.
+        prices = secrets.get("prices", {})
+        self.prices = PriceTable.load(prices.get("path"), max_age=timedelta(days=prices.get("max_age_days", 2)))
+
+        cache = secrets.get("cache", {})
+        self.cache_dir = cache.get("path", ".panel_cache")
+        self.history_ttl = timedelta(hours=cache.get("history_ttl_hours", 24 * 7))
+        self.memory_bytes = cache.get("memory_mb", 256) * 2**20
+        self.max_disk_bytes = cache.get("max_disk_mb", 1024) * 2**20
+
+        self.max_chart_buckets = secrets.get("charts", {}).get("max_buckets", 500)
+
+        # Prepared exports wait here for their download; files older than max_age_minutes go with the next export.
+        export = secrets.get("export", {})
+        self.export_dir = export.get("path", ".exports")
+        self.export_max_age = timedelta(minutes=export.get("max_age_minutes", 60))
+
+        live = secrets.get("live", {})
+        self.live_interval = timedelta(seconds=live.get("interval_seconds", 15))
+        self.live_rows = live.get("max_rows", 200)
+
+    def size_classes(self, symbol=SYMBOL):
+        buckets = {**self._buckets, **self._buckets.get(symbol, {})}
+        return SizeClasses(buckets.get("boundaries", DEFAULT_BOUNDARIES), unit=buckets.get("unit", symbol))
+
+    @property
+    def namespace(self):
+        """Part of every cache key: whatever changes the meaning of a cached panel or chunk belongs here.
+
+        Token and size classes are added per token by :meth:`range_planner`, so all tokens share one cache.
+        """
+        return f"{EXTRACT_VERSION}:{rollup.VERSION}:{self.prices.version}:{self.distinct_mode}:{self.sketch_precision}"
+
+    # --- Factories ----------------------------------------------------------------------------------------------
+    def connection_pool(self):
+        return ConnectionPool(snowflake_connector(self.snowflake), max_size=self.snowflake.get("pool_size", 4))
+
+    def query_scheduler(self, pool):
+        return QueryScheduler(pool, max_concurrency=self.snowflake.get("max_concurrency", 4))
+
+    def transfer_store(self):
+        return TransferStore(self.store_dir, recheck=self.recheck, symbols=self.symbols)
+
+    def panel_cache(self, store=None):
+        # Ranges that ended before the store's re-check window are immutable history and are kept long;
+        # ranges touching the last few days - or not yet synced into ``store`` - get the sync interval as TTL
+        # so new transfers show up.
+        return TwoTierCache(
+            self.cache_dir,
+            ttl=DateRangeTTL(
+                history=self.history_ttl, recent=self.sync_interval, settle=self.recheck,
+                settled_before=store.settled_before if store is not None else None,
+            ),
+            memory_bytes=self.memory_bytes,
+            max_disk_bytes=self.max_disk_bytes,
+        )
+
+    def range_planner(self, cache, read_rows, symbol=SYMBOL):
+        """Planner of ``symbol``; ``read_rows(start_date, end_date, symbol=...)`` reads its unpriced store rows."""
+        def read_priced(start_date, end_date):
+            return self.prices.apply(read_rows(start_date, end_date, symbol=symbol), symbol)
+
+        return RangePlanner(
+            cache,
+            read_priced,
+            sketch_factory(self.distinct_mode, self.sketch_precision),
+            namespace=f"rollup:{self.namespace}:{symbol}",
+            size_classes=self.size_classes(symbol),
+            symbol=symbol,
+        )
+
+    def range_planners(self, cache, read_rows):
+        return {symbol: self.range_planner(cache, read_rows, symbol) for symbol in self.symbols}
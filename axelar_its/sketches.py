@@ -0,0 +1,177 @@
+"""Mergeable distinct-count sketches for the daily rollup.
+
+``COUNT(DISTINCT ...)`` is not additive, so the cube keeps one sketch per day
+and route and answers any range by merging them. Two interchangeable kinds are
+available:
+
+* :class:`ExactSketch` - a frozen set of the values; exact, but its size grows
+  with the number of distinct values.
+* :class:`HyperLogLog` - fixed ``2**precision`` byte registers. The relative
+  standard error of :meth:`HyperLogLog.count` is ``1.04 / sqrt(2**precision)``,
+  about 1.6% at the default precision of 12 (4 KiB per sketch) and 0.8% at 14.
+  Cardinalities below ``2.5 * 2**precision`` use linear counting and are
+  usually much closer than that.
+"""
+
+import math
+import sys
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PRECISION = 12
+
+
+class ExactSketch:
+    __slots__ = ("values",)
+
+    def __init__(self, values=frozenset()):
+        self.values = frozenset(values)
+
+    @classmethod
+    def from_values(cls, values):
+        return cls(pd.Series(values).dropna())
+
+    def merge(self, other):
+        return ExactSketch(self.values | other.values)
+
+    @classmethod
+    def merge_many(cls, sketches):
+        """Union of every sketch's set in one call."""
+        return cls(frozenset().union(*(sketch.values for sketch in sketches)))
+
+    def count(self):
+        return len(self.values)
+
+    @property
+    def nbytes(self):
+        # The set and its strings: they are shared with the source frame only until the sketch is pickled.
+        return sys.getsizeof(self.values) + sum(map(sys.getsizeof, self.values))
+
+
+class HyperLogLog:
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision=DEFAULT_PRECISION, registers=None):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"precision must be between 4 and 18, got {precision}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8) if registers is None else registers
+
+    @classmethod
+    def from_values(cls, values, precision=DEFAULT_PRECISION):
+        sketch = cls(precision)
+        sketch.add_hashes(hash_values(values))
+        return sketch
+
+    @property
+    def nbytes(self):
+        return self.registers.nbytes
+
+    @staticmethod
+    def relative_error(precision=DEFAULT_PRECISION):
+        """Relative standard error of :meth:`count` for a given precision."""
+        return 1.04 / math.sqrt(1 << precision)
+
+    def add_hashes(self, hashes):
+        index, rank = _register_ranks(hashes, self.precision)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("cannot merge HyperLogLog sketches of different precision")
+        return HyperLogLog(self.precision, np.maximum(self.registers, other.registers))
+
+    @classmethod
+    def merge_many(cls, sketches):
+        """Register-wise maximum of every sketch in one reduction."""
+        precision = sketches[0].precision
+        if any(sketch.precision != precision for sketch in sketches):
+            raise ValueError("cannot merge HyperLogLog sketches of different precision")
+        return cls(precision, np.maximum.reduce([sketch.registers for sketch in sketches]))
+
+    def count(self):
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.ldexp(1.0, -self.registers.astype(np.int64)).sum()
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+def hash_values(values):
+    """Stable 64-bit hashes of the non-null ``values``."""
+    values = pd.Series(values).dropna()
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Hash the dictionary once and index it by the codes.
+        return pd.util.hash_array(values.cat.categories.to_numpy(dtype=object))[values.cat.codes.to_numpy()]
+    return pd.util.hash_array(values.to_numpy(dtype=object))
+
+
+def _register_ranks(hashes, precision):
+    """Register index and rank of every hash."""
+    p = np.uint64(precision)
+    index = (hashes >> (np.uint64(64) - p)).astype(np.intp)
+    remainder = hashes & np.uint64((1 << (64 - precision)) - 1)
+    rank = (64 - precision) - _bit_length(remainder) + 1
+    return index, rank.astype(np.uint8)
+
+
+def _bit_length(x):
+    """Exact per-element bit length of a ``uint64`` array."""
+    x = x.copy()
+    length = np.zeros(x.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        wide = (x >> np.uint64(shift)) > 0
+        length[wide] += shift
+        x[wide] >>= np.uint64(shift)
+    return length + (x > 0)
+
+
+def sketch_factory(mode="exact", precision=DEFAULT_PRECISION):
+    """Return a ``values -> sketch`` builder for ``mode`` (``"exact"`` or ``"approx"``)."""
+    if mode == "exact":
+        return ExactSketch.from_values
+    if mode == "approx":
+        return lambda values: HyperLogLog.from_values(values, precision)
+    raise ValueError(f"unknown distinct mode {mode!r}; expected 'exact' or 'approx'")
+
+
+def merge_all(sketches):
+    """Merge an iterable of same-kind sketches in one k-way merge (None when it is empty)."""
+    sketches = list(sketches)
+    if not sketches:
+        return None
+    return type(sketches[0]).merge_many(sketches)
+
+
+def count_all(sketches):
+    merged = merge_all(sketches)
+    return 0 if merged is None else merged.count()
+
+
+def group_sketches(make_sketch, groups, ngroups, values):
+    """One sketch per group ``0 .. ngroups - 1`` of ``values``, as ``make_sketch`` would build them group by group.
+
+    ``groups`` is the group number of every value (``GroupBy.ngroup``). Exact and HyperLogLog sketches are
+    built in one pass over all values - sorted slices for sets, one ``np.maximum.at`` into the registers of
+    every group - instead of one builder call per group; other builders fall back to those calls.
+    """
+    values = pd.Series(values).reset_index(drop=True)
+    present = values.notna().to_numpy()
+    groups = np.asarray(groups)[present]
+    values = values[present]
+    probe = make_sketch(values.iloc[:0])
+    if isinstance(probe, HyperLogLog):
+        registers = np.zeros((ngroups, 1 << probe.precision), dtype=np.uint8)
+        index, rank = _register_ranks(hash_values(values), probe.precision)
+        np.maximum.at(registers, (groups, index), rank)
+        return [HyperLogLog(probe.precision, row) for row in registers]
+    order = np.argsort(groups, kind="stable")
+    bounds = np.searchsorted(groups[order], np.arange(ngroups + 1))
+    if isinstance(probe, ExactSketch):
+        values = values.to_numpy(dtype=object)[order]
+        return [ExactSketch(values[lo:hi]) for lo, hi in zip(bounds[:-1], bounds[1:])]
+    values = values.iloc[order]
+    return [make_sketch(values.iloc[lo:hi]) for lo, hi in zip(bounds[:-1], bounds[1:])]
@@ -0,0 +1,140 @@
+"""Canonical, bind-parameterized SQL for the ITS token extract.
+
+Every warehouse query is built here from one definition of the projected
+``fact_gmp`` columns, with values passed as ``?`` binds instead of being
+interpolated into the text. The text is whitespace-normalized, so two calls
+asking for the same thing produce byte-identical SQL - which is what
+Snowflake's result cache keys on - and :attr:`Query.fingerprint` gives a
+stable key for our own caches. Several tokens are fetched by one query with
+a sorted ``IN`` list, whose rows carry their ``symbol``. USD values are not
+computed here: the extract returns the warehouse's inputs to them and
+:mod:`axelar_its.prices` prices the rows. The connection is opened with
+``paramstyle="qmark"`` (see :func:`axelar_its.connection.snowflake_connector`)
+so the binds are sent to the server rather than substituted client-side.
+
+The same queries can be rendered for DuckDB, whose JSON functions stand in
+for Snowflake's VARIANT paths; the benchmarks run them against a local
+stand-in of ``fact_gmp`` (see :mod:`benchmarks.standin`).
+"""
+
+import re
+from typing import NamedTuple
+
+import pandas as pd
+
+from axelar_its.cache import fingerprint
+
+SYMBOL = "ATH"
+
+# --- Extract definition --------------------------------------------------------------------------------------------
+# (alias, expression) of every column the dashboard reads.
+COLUMNS = [
+    ("created_at", "created_at"),
+    ("tx_id", "id"),
+    ("sender_address", "data:call.transaction.from::STRING"),
+    ("amount", "data:amount::FLOAT"),
+    # USD inputs: amount_usd and fee are derived from them by axelar_its.prices when rows are read.
+    ("value_usd", "TRY_CAST(data:value::float AS FLOAT)"),
+    ("gas_used", "data:gas:gas_used_amount::FLOAT"),
+    ("gas_symbol", "data:gas_price_rate:source_token.symbol::STRING"),
+    ("gas_price_usd", "data:gas_price_rate:source_token.token_price.usd::FLOAT"),
+    ("express_fee_usd", "TRY_CAST(data:fees:express_fee_usd::float AS FLOAT)"),
+    ("source_chain", "data:call.chain::STRING"),
+    ("destination_chain", "data:call.returnValues.destinationChain::STRING"),
+    ("symbol", "data:symbol::STRING"),
+]
+
+SOURCE = "axelar.axelscan.fact_gmp"
+SYMBOL_COLUMN = "data:symbol::STRING"
+
+_QUOTED = re.compile(r"('(?:[^']|'')*')")
+_VARIANT_PATH = re.compile(r"data:(\w+(?:[.:]\w+)*)(?:::(\w+))?")
+
+
+def canonical(text):
+    """Collapse whitespace outside string literals, so layout never changes the query text."""
+    parts = _QUOTED.split(text)
+    parts[::2] = [re.sub(r"\s+", " ", part) for part in parts[::2]]
+    return "".join(parts).strip()
+
+
+def _duckdb(text):
+    """Rewrite Snowflake VARIANT paths (``data:a.b::TYPE``) and types for DuckDB."""
+    def extract(match):
+        value = f"json_extract_string(data, '$.{match.group(1).replace(':', '.')}')"
+        return value if (match.group(2) or "").upper() == "STRING" else f"TRY_CAST({value} AS DOUBLE)"
+    # Snowflake's FLOAT is double precision; DuckDB's is single.
+    return _VARIANT_PATH.sub(extract, text).replace(" AS FLOAT)", " AS DOUBLE)")
+
+
+DIALECTS = {"snowflake": lambda text: text, "duckdb": _duckdb}
+
+
+def _bindable(value):
+    # The connector binds datetime/date, not pandas Timestamps.
+    return value.to_pydatetime() if isinstance(value, pd.Timestamp) else value
+
+
+class Query(NamedTuple):
+    text: str
+    params: tuple = ()
+
+    @property
+    def fingerprint(self):
+        """Stable digest of the canonical text and its bind values."""
+        return fingerprint(self.text, list(self.params))
+
+
+def build(select, conditions=(), params=(), dialect="snowflake"):
+    """``SELECT <select> FROM fact_gmp WHERE <conditions>`` as a canonical :class:`Query`."""
+    where = " AND ".join(f"({condition})" for condition in conditions)
+    text = f"SELECT {select} FROM {SOURCE}" + (f" WHERE {where}" if where else "")
+    return Query(canonical(DIALECTS[dialect](text)), tuple(_bindable(value) for value in params))
+
+
+def _symbol_condition(symbols):
+    """Condition and binds selecting ``symbols``: a sorted ``IN`` list, so any order gives the same text."""
+    symbols = sorted({symbols} if isinstance(symbols, str) else set(symbols))
+    if len(symbols) == 1:
+        return f"{SYMBOL_COLUMN} = ?", symbols
+    return f"{SYMBOL_COLUMN} IN ({', '.join('?' * len(symbols))})", symbols
+
+
+def _projection():
+    return ", ".join(f'{expression} AS "{alias}"' for alias, expression in COLUMNS)
+
+
+# --- Queries -------------------------------------------------------------------------------------------------------
+def extract(start_date=None, end_date=None, since=None, until=None, after=None, symbols=SYMBOL, dialect="snowflake"):
+    """The projected rows of ``symbols``, optionally restricted by date (inclusive) and/or timestamp (half-open).
+
+    ``symbols`` is one symbol or several. ``after`` is a ``(created_at, tx_id)`` key: only rows strictly after
+    it in that order are returned.
+    """
+    condition, params = _symbol_condition(symbols)
+    conditions = [condition]
+    for condition, value in (
+        ("created_at::date >= ?", start_date),
+        ("created_at::date <= ?", end_date),
+        ("created_at >= ?", since if since is None else pd.Timestamp(since)),
+        ("created_at < ?", until if until is None else pd.Timestamp(until)),
+    ):
+        if value is not None:
+            conditions.append(condition)
+            params.append(value)
+    if after is not None:
+        # The plain range condition comes first so micro-partition pruning applies; the tie-break is on id.
+        created_at, tx_id = pd.Timestamp(after[0]), after[1]
+        conditions += ["created_at >= ?", "created_at > ? OR id > ?"]
+        params += [created_at, created_at, tx_id]
+    return build(_projection(), conditions, params, dialect)
+
+
+def first_transfer_at(symbols=SYMBOL, dialect="snowflake"):
+    condition, params = _symbol_condition(symbols)
+    return build('MIN(created_at) AS "first_at"', [condition], params, dialect)
+
+
+# Fingerprint of the extract definition itself: part of cache namespaces, so changing a column expression
+# invalidates what was computed from the old one.
+EXTRACT_VERSION = extract().fingerprint[:12]
@@ -0,0 +1,318 @@
+"""Append-only local Parquet store of ITS token GMP rows with high-watermark sync.
+
+Rows are kept in one Parquet file per token and calendar month of
+``created_at`` (``symbol=ATH/month=2025-07.parquet``) and are unique on
+``tx_id``. A sync fetches every configured token with one batched query per
+window: tokens already in the store only ask for rows newer than the stored
+high-watermark, minus a re-check window that picks up late-arriving updates
+to recent rows, and tokens added since the last sync are backfilled from
+their first transfer. Everything else is answered from local files.
+Reads return the compact layout of :mod:`axelar_its.compact`, with the USD
+inputs of the extract unpriced (see :mod:`axelar_its.prices`). A store
+written by another extract definition is emptied and fetched again.
+"""
+
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+import pandas as pd
+
+from axelar_its import compact, transfers
+from axelar_its.sql import EXTRACT_VERSION, SYMBOL
+
+DEFAULT_RECHECK = timedelta(hours=48)
+
+_META_FILE = "_meta.json"
+_LOCK_FILE = "_store.lock"
+
+
+class TransferStore:
+    def __init__(self, root, recheck=DEFAULT_RECHECK, symbols=(SYMBOL,)):
+        """
+        recheck: how far behind the high-watermark a sync starts again
+        symbols: the tokens a sync fetches
+        """
+        self.root = root
+        self.recheck = recheck
+        self.symbols = sorted(set(symbols))
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        os.makedirs(root, exist_ok=True)
+        self._check_version()
+
+    # --- Locking ------------------------------------------------------------------------------------------------
+    @contextmanager
+    def _locked(self):
+        """Serialize writers across threads and across the processes sharing the root (the app and the
+        precompute worker), with an ``flock`` on one lock file that is never removed; re-entrant in a thread."""
+        with self._lock:
+            if not self._lock_depth:
+                self._lock_file = open(os.path.join(self.root, _LOCK_FILE), "a")
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if not self._lock_depth:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                    self._lock_file.close()
+
+    # --- Metadata -----------------------------------------------------------------------------------------------
+    def _meta_path(self):
+        return os.path.join(self.root, _META_FILE)
+
+    def _read_meta(self):
+        try:
+            with open(self._meta_path()) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write_meta(self, meta):
+        with self._locked():
+            _write_replacing(self._meta_path(), lambda tmp: _dump_json(meta, tmp))
+
+    def high_watermark(self):
+        """Largest ``created_at`` held locally, or None for an empty store."""
+        value = self._read_meta().get("high_watermark")
+        return pd.Timestamp(value) if value else None
+
+    def settled_before(self, symbol=None):
+        """Rows of ``symbol`` (of every token when None) created before this are final in the store.
+
+        That is the high-watermark minus the re-check window, which no later sync rewrites; None while the
+        store is empty or the token has not been synced yet.
+        """
+        meta = self._read_meta()
+        symbols = self.symbols if symbol is None else [symbol]
+        if not meta.get("high_watermark") or any(symbol not in meta.get("symbols", []) for symbol in symbols):
+            return None
+        return pd.Timestamp(meta["high_watermark"]) - pd.Timedelta(self.recheck)
+
+    def last_sync(self):
+        value = self._read_meta().get("last_sync")
+        return pd.Timestamp(value) if value else None
+
+    def _check_version(self):
+        """Drop the rows of an older extract definition, so the next sync fetches them again in the current one.
+
+        Partitions hold the extract columns as they were fetched; rows of another definition (an earlier
+        column set, or the single-token layout with its month files at the root) cannot be read as current ones.
+        """
+        with self._locked():
+            meta = self._read_meta()
+            if meta.get("extract_version") == EXTRACT_VERSION:
+                return
+            for name in os.listdir(self.root):
+                path = os.path.join(self.root, name)
+                if name.startswith("symbol=") and os.path.isdir(path):
+                    shutil.rmtree(path)
+                elif name.startswith("month=") and name.endswith(".parquet"):
+                    os.remove(path)
+            self._write_meta({"extract_version": EXTRACT_VERSION})
+
+    # --- Partitions ---------------------------------------------------------------------------------------------
+    def _symbol_dir(self, symbol):
+        return os.path.join(self.root, f"symbol={symbol}")
+
+    def _partition_path(self, month, symbol=SYMBOL):
+        return os.path.join(self._symbol_dir(symbol), f"month={month.strftime('%Y-%m')}.parquet")
+
+    def _partitions(self, symbol=SYMBOL):
+        directory = self._symbol_dir(symbol)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.startswith("month=") and name.endswith(".parquet")
+        )
+
+    def _months(self, start, end):
+        return pd.period_range(pd.Timestamp(start).to_period("M"), pd.Timestamp(end).to_period("M"), freq="M")
+
+    def upsert(self, delta):
+        """Merge ``delta`` into the token and month partitions it touches; the newest copy of a ``tx_id`` wins.
+
+        The token of a row is its ``symbol`` column, which the partition path then stands in for.
+        """
+        if delta.empty:
+            return
+        delta = delta.assign(created_at=pd.to_datetime(delta["created_at"]))
+        with self._locked():
+            for (symbol, month), rows in delta.groupby([delta["symbol"], delta["created_at"].dt.to_period("M")]):
+                rows = rows.drop(columns="symbol")
+                path = self._partition_path(month, symbol)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if os.path.exists(path):
+                    rows = pd.concat([pd.read_parquet(path), rows], ignore_index=True)
+                rows = (
+                    rows.drop_duplicates("tx_id", keep="last")
+                    .sort_values(["created_at", "tx_id"], ignore_index=True)
+                )
+                _write_replacing(path, lambda tmp, rows=rows: rows.to_parquet(tmp, index=False))
+
+    # --- Sync ---------------------------------------------------------------------------------------------------
+    def _fetch_tasks(self, scheduler, since, symbols):
+        """Split the sync window of ``symbols`` into month-aligned queries; the last one is left open-ended."""
+        if since is None:
+            since = scheduler.run(lambda conn: transfers.load_first_transfer_at(conn, symbols))
+            if since is None:
+                return {}
+        bounds = [pd.Timestamp(since)]
+        bounds += list(pd.date_range((bounds[0] + pd.offsets.MonthBegin()).normalize(), pd.Timestamp.now(), freq="MS"))
+        bounds.append(None)
+        return {
+            (tuple(symbols), lower, upper): (
+                lambda conn, lower=lower, upper=upper: transfers.load_transfers_since(conn, lower, upper, symbols)
+            )
+            for lower, upper in zip(bounds[:-1], bounds[1:])
+        }
+
+    def sync(self, scheduler):
+        """Fetch rows newer than the high-watermark (minus the re-check window); returns the delta size.
+
+        A long window (first backfill, a token added to :attr:`symbols`, or a store left idle for weeks)
+        is fetched as concurrent month-sized queries through ``scheduler`` and written as each one completes.
+        """
+        with self._locked():
+            meta = self._read_meta()
+            watermark = self.high_watermark()
+            synced = [symbol for symbol in self.symbols if symbol in meta.get("symbols", [])]
+            added = [symbol for symbol in self.symbols if symbol not in synced]
+            tasks = {}
+            if synced:
+                tasks.update(self._fetch_tasks(scheduler, watermark - self.recheck if watermark is not None else None, synced))
+            if added:
+                tasks.update(self._fetch_tasks(scheduler, None, added))
+            fetched, newest = 0, watermark
+            for _, delta in scheduler.as_completed(tasks):
+                self.upsert(delta)
+                if not delta.empty:
+                    fetched += len(delta)
+                    chunk_newest = pd.to_datetime(delta["created_at"]).max()
+                    newest = chunk_newest if newest is None else max(newest, chunk_newest)
+            if newest is not None:
+                meta["high_watermark"] = newest.isoformat()
+            meta["symbols"] = self.symbols
+            meta["last_sync"] = pd.Timestamp.now().isoformat()
+            self._write_meta(meta)
+            return fetched
+
+    def sync_if_stale(self, scheduler, max_age):
+        """Run :meth:`sync` unless the last one finished less than ``max_age`` ago."""
+        with self._locked():
+            last = self.last_sync()
+            if last is not None and pd.Timestamp.now() - last < max_age:
+                return 0
+            return self.sync(scheduler)
+
+    # --- Read ---------------------------------------------------------------------------------------------------
+    def read(self, start_date, end_date, columns=None, symbol=SYMBOL):
+        """``symbol`` rows with ``created_at::date BETWEEN start_date AND end_date``, ordered by ``created_at``, compact."""
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+        if columns is not None and "created_at" not in columns:
+            columns = ["created_at", *columns]
+        paths = [
+            path for path in (self._partition_path(month, symbol) for month in self._months(start_date, end_date))
+            if os.path.exists(path)
+        ]
+        if not paths:
+            return compact.compact(_empty(columns))
+        return compact.read_parquet(paths, columns, filters=[("created_at", ">=", start), ("created_at", "<", end)])
+
+    def page(self, start_date, end_date, limit, before=None, filters=(), predicate=None, symbol=SYMBOL):
+        """Up to ``limit`` ``symbol`` rows of ``[start_date, end_date]`` ordered by ``(created_at, tx_id)`` descending.
+
+        ``before`` is the keyset cursor: only rows strictly older than that ``(created_at, tx_id)``
+        pair are returned. ``filters`` are pyarrow ``(column, op, value)`` predicates pushed into the
+        Parquet reader and ``predicate`` an optional ``df -> mask`` applied after it. Partitions are
+        read newest first and reading stops once the page is full, so memory stays bounded by one
+        filtered month whatever the range.
+        """
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+        filters = [("created_at", ">=", start), ("created_at", "<", end), *filters]
+        if before is not None:
+            filters.append(("created_at", "<=", pd.Timestamp(before[0])))
+        frames, remaining = [], limit
+        for month in reversed(self._months(start_date, end_date)):
+            path = self._partition_path(month, symbol)
+            if before is not None and month.start_time > pd.Timestamp(before[0]):
+                continue
+            if not os.path.exists(path):
+                continue
+            df = pd.read_parquet(path, filters=filters)
+            if before is not None:
+                created_at, tx_id = pd.Timestamp(before[0]), before[1]
+                df = df[(df["created_at"] < created_at) | ((df["created_at"] == created_at) & (df["tx_id"] < tx_id))]
+            if predicate is not None:
+                df = df[predicate(df)]
+            df = df.sort_values(["created_at", "tx_id"], ascending=False).head(remaining)
+            frames.append(df)
+            remaining -= len(df)
+            if remaining <= 0:
+                break
+        if not frames:
+            return _empty()
+        return pd.concat(frames, ignore_index=True)
+
+    def first_day(self, symbol=SYMBOL):
+        """Day of the oldest stored ``symbol`` row, or None when there is none."""
+        paths = self._partitions(symbol)
+        if not paths:
+            return None
+        first = pd.read_parquet(paths[0], columns=["created_at"])["created_at"].min()
+        return None if pd.isna(first) else first.normalize()
+
+    def chains(self, symbols=None):
+        """Sorted distinct source and destination chains of ``symbols`` (default: all synced tokens)."""
+        chains = set()
+        paths = [path for symbol in symbols or self.symbols for path in self._partitions(symbol)]
+        for path in paths:
+            df = pd.read_parquet(path, columns=["source_chain", "destination_chain"])
+            chains.update(df["source_chain"].dropna().unique())
+            chains.update(df["destination_chain"].dropna().unique())
+        return sorted(chains)
+
+
+def _empty(columns=None):
+    df = pd.DataFrame({
+        "created_at": pd.Series(dtype="datetime64[ns]"),
+        "tx_id": pd.Series(dtype=object),
+        "sender_address": pd.Series(dtype=object),
+        "amount": pd.Series(dtype="float64"),
+        "value_usd": pd.Series(dtype="float64"),
+        "gas_used": pd.Series(dtype="float64"),
+        "gas_symbol": pd.Series(dtype=object),
+        "gas_price_usd": pd.Series(dtype="float64"),
+        "express_fee_usd": pd.Series(dtype="float64"),
+        "source_chain": pd.Series(dtype=object),
+        "destination_chain": pd.Series(dtype=object),
+    })
+    return df if columns is None else df[columns]
+
+
+def _write_replacing(path, write):
+    """``write(tmp)`` a uniquely named file next to ``path``, then move it over ``path`` in one step."""
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=os.path.dirname(path))
+    os.close(fd)
+    try:
+        write(tmp)
+        os.chmod(tmp, 0o644)  # mkstemp makes it private; the store is shared with the worker
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def _dump_json(value, path):
+    with open(path, "w") as f:
+        json.dump(value, f)
@@ -0,0 +1,138 @@
+"""Keyset-paginated transfer tracker over the local store.
+
+The tracker table used to ship the 1,000 most recent rows of the whole
+extract to the browser. It now asks :meth:`TransferStore.page` for one page
+at a time, ordered by ``(created_at, tx_id)`` descending: a page is addressed
+by the key of the last row of the previous one, so deep pages cost the same
+as the first and no row is skipped or repeated when new transfers arrive.
+Filters are evaluated by the store, not on the displayed frame. Pages are
+kept in a small LRU, and the page after the one just served is fetched in the
+background so that "Next" is usually answered from memory.
+"""
+
+import operator
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+
+import pandas as pd
+
+from axelar_its import transfers
+from axelar_its.sql import SYMBOL
+
+_OPERATORS = {"==": operator.eq, "!=": operator.ne, ">=": operator.ge, "<=": operator.le}
+
+
+class TrackerQuery(NamedTuple):
+    start_date: object
+    end_date: object
+    source_chain: Optional[str] = None
+    destination_chain: Optional[str] = None
+    sender: Optional[str] = None
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    symbol: str = SYMBOL
+
+    def filters(self):
+        """pyarrow predicates pushed into the Parquet reader."""
+        # ``!=`` also drops NULL destinations, matching :func:`transfers.routed`.
+        filters = [("destination_chain", "!=", transfers.EXCLUDED_DESTINATION)]
+        if self.source_chain:
+            filters.append(("source_chain", "==", self.source_chain))
+        if self.destination_chain:
+            filters.append(("destination_chain", "==", self.destination_chain))
+        if self.min_amount is not None:
+            filters.append(("amount", ">=", float(self.min_amount)))
+        if self.max_amount is not None:
+            filters.append(("amount", "<=", float(self.max_amount)))
+        return filters
+
+    def predicate(self):
+        """Row mask for what Parquet filters cannot express (case-insensitive sender match)."""
+        if not self.sender:
+            return None
+        sender = self.sender.strip().lower()
+        return lambda df: df["sender_address"].str.lower() == sender
+
+    def mask(self, df):
+        """The range, :meth:`filters` and :meth:`predicate` evaluated on an in-memory frame of extract rows."""
+        created_at = df["created_at"]
+        mask = (created_at >= pd.Timestamp(self.start_date)) & (created_at < pd.Timestamp(self.end_date) + pd.Timedelta(days=1))
+        for column, op, value in self.filters():
+            # Like the Parquet reader, no comparison matches a NULL.
+            mask &= df[column].notna() & _OPERATORS[op](df[column], value)
+        predicate = self.predicate()
+        return mask if predicate is None else mask & predicate(df)
+
+
+class Page(NamedTuple):
+    rows: pd.DataFrame
+    next_cursor: Optional[tuple]  # key of the last row, or None on the last page
+
+
+class TransferTracker:
+    def __init__(self, store, page_size=100, cached_pages=16):
+        self.store = store
+        self.page_size = page_size
+        self.cached_pages = cached_pages
+        self._pages = OrderedDict()  # (query, cursor, last_sync) -> Page
+        self._pending = {}  # same key -> Future of a background prefetch
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tracker-prefetch")
+
+    def _fetch(self, query, cursor):
+        rows = self.store.page(
+            query.start_date, query.end_date, self.page_size + 1,
+            before=cursor, filters=query.filters(), predicate=query.predicate(), symbol=query.symbol,
+        )
+        more = len(rows) > self.page_size
+        rows = rows.head(self.page_size)
+        last = rows.iloc[-1] if more else None
+        return Page(rows, (last["created_at"], last["tx_id"]) if more else None)
+
+    def _remember(self, key, page):
+        with self._lock:
+            self._pages[key] = page
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.cached_pages:
+                self._pages.popitem(last=False)
+
+    def _load(self, key):
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None:
+                self._pages.move_to_end(key)
+                return page
+            pending = self._pending.get(key)
+        if pending is not None:
+            return pending.result()
+        page = self._fetch(*key[:2])
+        self._remember(key, page)
+        return page
+
+    def _prefetch(self, key):
+        with self._lock:
+            if key in self._pages or key in self._pending:
+                return
+            future = self._executor.submit(self._fetch, *key[:2])
+            self._pending[key] = future
+
+        def done(future):
+            if future.exception() is None:
+                self._remember(key, future.result())
+            with self._lock:
+                self._pending.pop(key, None)
+
+        future.add_done_callback(done)
+
+    def page(self, query, cursor=None):
+        """The page of ``query`` starting after ``cursor``; the following page is prefetched."""
+        version = self.store.last_sync()  # a sync may add rows to any page: key the cache by it
+        page = self._load((query, cursor, version))
+        if page.next_cursor is not None:
+            self._prefetch((query, page.next_cursor, version))
+        return page
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,86 @@
+"""Warehouse loaders of the ITS token transfer extract and the helpers its panels share.
+
+Rows reach the dashboard through :class:`~axelar_its.store.TransferStore`,
+whose syncs pull the projected extract of :mod:`axelar_its.sql` with
+:func:`load_transfers_since`; the live tail polls :func:`load_transfers_after`.
+Panels are rolled up from the store by :mod:`axelar_its.rollup`, and the
+bucketing, routing and path helpers below reproduce the SQL semantics they
+follow (``DATE_TRUNC``, the Moonbeam exclusion, NULL paths).
+"""
+
+import numpy as np
+import pandas as pd
+
+from axelar_its import sql
+from axelar_its.fetch import fetch_frame
+
+# --- Extract -------------------------------------------------------------------------------------------------------
+EXCLUDED_DESTINATION = "Moonbeam"
+
+TIMEFRAMES = ["day", "week", "month"]  # finest first
+_PERIODS = {"day": "D", "week": "W-SUN", "month": "M"}
+
+
+def load_transfers_since(conn, since=None, until=None, symbols=sql.SYMBOL):
+    """Pull the projected rows of ``symbols`` with ``since <= created_at < until``; either bound may be left open."""
+    return fetch_frame(conn, *sql.extract(since=since, until=until, symbols=symbols))
+
+
+def load_transfers_after(conn, created_at, tx_id, symbols=sql.SYMBOL):
+    """Pull the projected rows strictly after the ``(created_at, tx_id)`` key: the live tail's one query per tick."""
+    return fetch_frame(conn, *sql.extract(after=(created_at, tx_id), symbols=symbols))
+
+
+def load_first_transfer_at(conn, symbols=sql.SYMBOL):
+    """``created_at`` of the oldest row of ``symbols``, or None when there is none."""
+    first_at = fetch_frame(conn, *sql.first_transfer_at(symbols))["first_at"].iloc[0]
+    return None if pd.isna(first_at) else pd.Timestamp(first_at)
+
+
+# --- Helpers -------------------------------------------------------------------------------------------------------
+def truncate(created_at, timeframe):
+    """Vectorized ``DATE_TRUNC(timeframe, created_at)`` (weeks start on Monday)."""
+    return created_at.dt.to_period(_PERIODS[timeframe]).dt.start_time
+
+
+def bucket_count(start_date, end_date, timeframe):
+    """Number of ``timeframe`` buckets that ``[start_date, end_date]`` touches."""
+    return len(pd.period_range(pd.Timestamp(start_date), pd.Timestamp(end_date), freq=_PERIODS[timeframe]))
+
+
+def bucket_last_day(bucket_start, timeframe):
+    """Last day of the ``timeframe`` bucket starting at ``bucket_start``."""
+    return pd.Timestamp(bucket_start).to_period(_PERIODS[timeframe]).end_time.normalize()
+
+
+def routed(df):
+    """Rows the path-level panels keep: ``destination_chain <> 'Moonbeam'`` (NULLs drop out as in SQL)."""
+    destination = df["destination_chain"]
+    return df[destination.notna() & (destination != EXCLUDED_DESTINATION)]
+
+
+def path_of(df):
+    """``source_chain || '➡' || destination_chain``, formatted once per distinct pair instead of once per row."""
+    source_codes, sources = pd.factorize(df["source_chain"])
+    destination_codes, destinations = pd.factorize(df["destination_chain"])
+    codes, pairs = pd.MultiIndex.from_arrays([source_codes, destination_codes]).factorize()
+    # A NULL on either side gives a NULL path, as string concatenation does in SQL.
+    labels = np.array(
+        [None if s < 0 or d < 0 else f"{sources[s]}➡{destinations[d]}" for s, d in pairs], dtype=object,
+    )
+    return pd.Series(labels[codes], index=df.index)
+
+
+# --- Row 6 ---------------------------------------------------------------------------------------------------------
+def format_transfer_rows(recent, symbol=sql.SYMBOL):
+    """Tracker-table presentation of extract rows (rounding and display column names)."""
+    return pd.DataFrame({
+        "⏰Date": recent["created_at"],
+        f"💸Amount {symbol}": recent["amount"].round(2),
+        "💰Amount USD": recent["amount_usd"].round(2),
+        "📤Source Chain": recent["source_chain"],
+        "📥Destination Chain": recent["destination_chain"],
+        "👥Sender": recent["sender_address"],
+        "⛽Fee USD": recent["fee"].round(3),
+        "🔗TX ID": recent["tx_id"],
+    }).reset_index(drop=True)
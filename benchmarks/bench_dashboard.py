@@ -0,0 +1,222 @@
+"""Cost of a dashboard render, stage by stage, against a local stand-in warehouse.
+
+    python -m benchmarks.bench_dashboard [--rows 10000 1000000 10000000] [--timeframes day week month]
+                                         [--repeat 3] [--output results.json] [--baseline old.json]
+
+For every size, :mod:`benchmarks.standin` fills a DuckDB ``fact_gmp`` with
+that many synthetic rows and the dashboard's own code runs on it: the
+extract query (Arrow fetch), its compact layout (with the memory of both),
+the as-of join pricing it, the day-level rollup cube, every panel loader for every timeframe, its
+figure builder and the Plotly JSON serialization Streamlit performs, plus
+one tracker page read from the local store. Each size runs in its own
+process so its peak RSS can be reported.
+
+Times are the best of ``--repeat`` runs. ``peak_mib`` is the Python heap
+peak of one extra traced run (tracemalloc, which misses Arrow and DuckDB
+buffers); ``peak_rss_mib`` is the growth of the whole process. Results are
+written as JSON tagged with the git commit, and ``--baseline`` prints the
+time ratios against an earlier results file.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import plotly.io as pio
+
+from axelar_its import buckets, compact, figures, rollup, sql
+from axelar_its.fetch import fetch_frame
+from axelar_its.prices import PriceTable
+from axelar_its.rollup import RollupView
+from axelar_its.store import TransferStore
+from axelar_its.tracker import TrackerQuery
+from benchmarks import standin
+
+DEFAULT_ROWS = [10_000, 1_000_000, 10_000_000]
+START_DATE, END_DATE = standin.FIRST_DAY, "2025-08-31"
+
+# name -> (takes a timeframe, loader(view, timeframe) -> data, figure builder(data) -> figures or None)
+LOADERS = {
+    "metrics": (False, lambda view, _: view.metrics(), None),
+    "timeseries": (True, lambda view, tf: view.timeseries(tf), lambda data: figures.timeseries_figures(data, {})),
+    "path_summary": (False, lambda view, _: view.path_summary(), figures.path_donuts),
+    "volume_distribution": (
+        True,
+        lambda view, tf: (view.volume_distribution(tf), view.volume_distribution_total()),
+        lambda data: figures.volume_distribution_figures(*data, buckets.DEFAULT.colors),
+    ),
+    "weekly_breakdown": (False, lambda view, _: view.weekly_breakdown(), figures.weekly_figures),
+    "seasonality": (
+        False,
+        lambda view, _: (view.weekday_hour(), view.hour_of_day()),
+        lambda data: figures.seasonality_figures(*data, "senders_count"),
+    ),
+}
+
+
+def _max_rss_bytes():
+    # ru_maxrss is reported in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def measure(fn, repeat):
+    """``(result, best seconds, traced heap peak in MiB)`` of ``fn()``."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, min(timings), peak / 2**20
+
+
+def run_size(rows, timeframes, repeat):
+    """Benchmark one table size in this process; returns a JSON-able result."""
+    started = time.perf_counter()
+    db = standin.fact_gmp(rows)
+    setup_s = time.perf_counter() - started
+    baseline_rss = _max_rss_bytes()
+    conn = standin.arrow_connection(db)
+
+    extract, query_s, query_peak = measure(
+        lambda: fetch_frame(conn, *sql.extract(START_DATE, END_DATE, dialect="duckdb")), repeat,
+    )
+    compacted, compact_s, _ = measure(lambda: compact.compact(extract), repeat)
+    memory = compact.memory_report({"extract": extract, "compact": compacted}).set_index("frame")["MiB"]
+    priced, price_s, _ = measure(lambda: PriceTable().apply(compacted), repeat)
+    cube, cube_s, cube_peak = measure(lambda: rollup.build(priced), repeat)
+    view = RollupView(*cube)
+
+    loaders = []
+    for name, (by_timeframe, load, build) in LOADERS.items():
+        for timeframe in timeframes if by_timeframe else [None]:
+            data, pandas_s, pandas_peak = measure(lambda: load(view, timeframe), repeat)
+            result = {"loader": name, "timeframe": timeframe, "pandas_s": pandas_s, "pandas_peak_mib": pandas_peak}
+            if build is not None:
+                figs, figure_s, figure_peak = measure(lambda: build(data), repeat)
+                specs, serialize_s, _ = measure(lambda: [pio.to_json(fig, validate=False) for fig in figs], repeat)
+                result.update(
+                    figure_s=figure_s, figure_peak_mib=figure_peak,
+                    serialize_s=serialize_s, json_bytes=sum(len(spec) for spec in specs),
+                )
+            loaders.append(result)
+
+    with tempfile.TemporaryDirectory() as root:
+        store = TransferStore(root)
+        _, store_write_s, _ = measure(lambda: store.upsert(extract), 1)
+        query = TrackerQuery(START_DATE, END_DATE)
+        # What a tracker page costs on a page-cache miss.
+        _, page_s, page_peak = measure(
+            lambda: store.page(START_DATE, END_DATE, 101, filters=query.filters(), predicate=query.predicate()), repeat,
+        )
+
+    return {
+        "rows": rows,
+        "extract_rows": len(extract),
+        "setup_s": setup_s,
+        "query_s": query_s,
+        "query_peak_mib": query_peak,
+        "compact_s": compact_s,
+        "extract_mib": memory["extract"],
+        "compact_mib": memory["compact"],
+        "price_s": price_s,
+        "cube_s": cube_s,
+        "cube_peak_mib": cube_peak,
+        "loaders": loaders,
+        "store_write_s": store_write_s,
+        "tracker_page_s": page_s,
+        "tracker_page_peak_mib": page_peak,
+        "peak_rss_mib": (_max_rss_bytes() - baseline_rss) / 2**20,
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], check=True, capture_output=True, text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _times(result):
+    """Flat ``{stage: seconds}`` of one size's result, for comparisons."""
+    times = {stage: result[stage] for stage in ("query_s", "compact_s", "price_s", "cube_s", "store_write_s", "tracker_page_s") if stage in result}
+    for loader in result["loaders"]:
+        for stage in ("pandas_s", "figure_s", "serialize_s"):
+            if stage in loader:
+                times[f"{loader['loader']}[{loader['timeframe'] or '-'}].{stage}"] = loader[stage]
+    return times
+
+
+def print_report(results, baseline=None):
+    before = {result["rows"]: _times(result) for result in (baseline or {}).get("results", [])}
+    for result in results:
+        print(f"\n{result['rows']:,} rows ({result['extract_rows']:,} in the extract), peak RSS +{result['peak_rss_mib']:.0f} MiB")
+        if "compact_mib" in result:
+            print(f"  extract {result['extract_mib']:.1f} MiB, compact {result['compact_mib']:.1f} MiB")
+        old = before.get(result["rows"], {})
+        for stage, seconds in _times(result).items():
+            ratio = f"{seconds / old[stage]:>8.2f}x" if old.get(stage) else ""
+            print(f"  {stage:<44}{seconds * 1000:>12.1f} ms{ratio}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    parser.add_argument("--timeframes", nargs="+", choices=["day", "week", "month"], default=["day", "week", "month"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/dashboard-<commit>.json)")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--only", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.only:
+        print(json.dumps(run_size(args.only, args.timeframes, args.repeat)))
+        return
+
+    results = []
+    for rows in args.rows:
+        child = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_dashboard", "--only", str(rows),
+             "--timeframes", *args.timeframes, "--repeat", str(args.repeat)],
+            check=True, capture_output=True, text=True,
+        )
+        results.append(json.loads(child.stdout))
+
+    commit = _commit()
+    report = {
+        "commit": commit,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    output = args.output or f"benchmarks/results/dashboard-{commit or 'local'}.json"
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    print(f"\nwritten to {output}")
+
+
+if __name__ == "__main__":
+    main()
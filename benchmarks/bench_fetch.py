@@ -0,0 +1,136 @@
+"""Compare DBAPI row fetching with Arrow batch fetching on a synthetic transfer result.
+
+    python -m benchmarks.bench_fetch [--rows 1000000] [--repeat 3]
+
+A DuckDB in-memory table with the columns of the shared ATH extract stands in
+for Snowflake. The "dbapi" path is what ``pd.read_sql`` does (``fetchall``
+tuples into a DataFrame); the "arrow" path is :func:`axelar_its.fetch.fetch_frame`
+on a cursor exposing ``fetch_arrow_batches`` like the Snowflake connector.
+Each path runs in its own process so its peak RSS growth can be reported.
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+
+from axelar_its.fetch import fetch_frame
+
+QUERY = "SELECT * FROM transfers"
+
+
+class ArrowCursor:
+    """DuckDB cursor exposing the Snowflake connector's ``fetch_arrow_batches``."""
+
+    def __init__(self, conn, batch_rows=100_000):
+        self._cursor = conn.cursor()
+        self._batch_rows = batch_rows
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def execute(self, query, params=None):
+        self._cursor.execute(query, params or [])
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetch_arrow_batches(self):
+        for batch in self._cursor.to_arrow_reader(self._batch_rows):
+            yield pa.Table.from_batches([batch])
+
+    def close(self):
+        self._cursor.close()
+
+
+class ArrowConnection:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self):
+        return ArrowCursor(self._conn)
+
+
+def synthetic_result(rows):
+    conn = duckdb.connect()
+    conn.execute(f"""
+        CREATE TABLE transfers AS
+        SELECT
+            TIMESTAMP '2024-06-10' + to_seconds(i * 13) AS created_at,
+            printf('0x%064x', i) AS tx_id,
+            printf('0x%040x', hash(i) % 50000) AS sender_address,
+            (hash(i) % 1000000) / 10.0 AS amount,
+            (hash(i) % 1000000) / 100.0 AS amount_usd,
+            (hash(i * 7) % 1000) / 1000.0 AS fee,
+            CASE WHEN i % 2 = 0 THEN 'arbitrum' ELSE 'ethereum' END AS source_chain,
+            CASE WHEN i % 2 = 0 THEN 'ethereum' ELSE 'arbitrum' END AS destination_chain
+        FROM range({rows}) AS t(i)
+    """)
+    return conn
+
+
+def fetch_dbapi(conn):
+    cursor = conn.cursor()
+    cursor.execute(QUERY)
+    columns = [column[0] for column in cursor.description]
+    return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+
+
+def fetch_arrow(conn):
+    return fetch_frame(ArrowConnection(conn), QUERY)
+
+
+PATHS = {"dbapi": fetch_dbapi, "arrow": fetch_arrow}
+
+
+def _max_rss_bytes():
+    # ru_maxrss is reported in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def measure(path, rows, repeat):
+    """Time one fetch path in this process; returns a JSON-able result."""
+    conn = synthetic_result(rows)
+    baseline = _max_rss_bytes()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        df = PATHS[path](conn)
+        timings.append(time.perf_counter() - started)
+        assert len(df) == rows
+        frame_bytes = int(df.memory_usage(deep=True).sum())
+        del df
+    return {"seconds": min(timings), "peak_rss_growth": _max_rss_bytes() - baseline, "frame_bytes": frame_bytes}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", choices=sorted(PATHS), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.only:
+        print(json.dumps(measure(args.only, args.rows, args.repeat)))
+        return
+
+    print(f"{args.rows:,} rows, best of {args.repeat}")
+    print(f"{'path':<8}{'seconds':>10}{'peak RSS growth MiB':>22}{'frame MiB':>12}")
+    for path in PATHS:
+        child = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_fetch", "--rows", str(args.rows), "--repeat", str(args.repeat), "--only", path],
+            check=True, capture_output=True, text=True,
+        )
+        result = json.loads(child.stdout)
+        print(f"{path:<8}{result['seconds']:>10.2f}{result['peak_rss_growth'] / 2**20:>22.1f}{result['frame_bytes'] / 2**20:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Accuracy check of the HyperLogLog sender sketches against exact counts on synthetic addresses.
+
+    python -m benchmarks.hll_accuracy [--precision 12] [--trials 5]
+
+For each cardinality the relative error of a single sketch, and of the same
+values split over 30 "daily" sketches and merged, must stay within three
+standard errors (``3 * 1.04 / sqrt(2**precision)``). Exits non-zero otherwise.
+``tests/test_sketches.py`` checks the same bound at a fixed seed under pytest.
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from axelar_its.sketches import ExactSketch, HyperLogLog, merge_all
+
+CARDINALITIES = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+
+
+def addresses(n, rng):
+    return np.array([f"0x{value:040x}" for value in rng.integers(0, 2**63, size=n, dtype=np.int64)], dtype=object)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--precision", type=int, default=12)
+    parser.add_argument("--trials", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    bound = 3 * HyperLogLog.relative_error(args.precision)
+    rng = np.random.default_rng(7)
+    failures = 0
+    print(f"precision={args.precision}  standard error={HyperLogLog.relative_error(args.precision):.4f}  bound={bound:.4f}")
+    for n in CARDINALITIES:
+        worst = 0.0
+        for _ in range(args.trials):
+            values = addresses(n, rng)
+            # Repeat a third of the values so duplicates are exercised as well.
+            values = np.concatenate([values, values[: n // 3]])
+            exact = ExactSketch.from_values(values).count()
+            single = HyperLogLog.from_values(values, args.precision).count()
+            merged = merge_all(HyperLogLog.from_values(chunk, args.precision) for chunk in np.array_split(values, 30)).count()
+            if merged != single:
+                print(f"  n={n}: merged estimate {merged} differs from single-sketch estimate {single}")
+                failures += 1
+            worst = max(worst, abs(single - exact) / exact)
+        status = "ok" if worst <= bound else "FAIL"
+        failures += status == "FAIL"
+        print(f"  n={n:>9,}  worst relative error={worst:.4f}  {status}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Local DuckDB stand-in for ``axelar.axelscan.fact_gmp``.
+
+The table has the columns the dashboard reads - ``id``, ``created_at`` and a
+JSON ``data`` document shaped like the VARIANT payload of Axelarscan GMP
+calls - so the extract of :mod:`axelar_its.sql`, rendered with
+``dialect="duckdb"``, runs against it unchanged. About one row in twenty is
+another token, so the symbol filter has something to discard.
+"""
+
+import duckdb
+
+from benchmarks.bench_fetch import ArrowConnection
+
+FIRST_DAY = "2024-06-10"
+SPAN_DAYS = 420
+CHAINS = ["arbitrum", "ethereum", "base", "Moonbeam"]
+
+
+def fact_gmp(rows, senders=50_000, database=":memory:"):
+    """A DuckDB connection holding ``rows`` synthetic GMP calls in ``axelar.axelscan.fact_gmp``."""
+    conn = duckdb.connect(database)
+    conn.execute("ATTACH ':memory:' AS axelar")
+    conn.execute("CREATE SCHEMA axelar.axelscan")
+    step = SPAN_DAYS * 86_400 / max(rows, 1)
+    conn.execute(f"""
+        CREATE TABLE axelar.axelscan.fact_gmp AS
+        SELECT
+            printf('0x%064x', i) AS id,
+            TIMESTAMP '{FIRST_DAY}' + to_microseconds(CAST(i * {step} * 1e6 AS BIGINT)) AS created_at,
+            json_object(
+                'symbol', CASE WHEN i % 20 = 0 THEN 'AXL' ELSE 'ATH' END,
+                'amount', amount,
+                'value', amount * 0.05,
+                'call', json_object(
+                    'chain', {_pick("hash(i)")},
+                    'transaction', json_object('from', printf('0x%040x', hash(i * 31) % {senders})),
+                    'returnValues', json_object('destinationChain', {_pick("hash(i) + 1 + hash(i * 7) % 3")})
+                ),
+                'gas', json_object('gas_used_amount', 0.0001 + (hash(i * 13) % 1000) / 1e6),
+                'gas_price_rate', json_object(
+                    'source_token', json_object('symbol', 'ETH', 'token_price', json_object('usd', 2500.0))
+                ),
+                'fees', json_object('express_fee_usd', (hash(i * 17) % 100) / 100.0)
+            ) AS data
+        FROM (
+            -- Log-uniform amounts from 1 to 1M ATH, so every size class is populated.
+            SELECT i, pow(10, (hash(i * 3) % 600000) / 100000.0) AS amount FROM range({rows}) AS t(i)
+        )
+    """)
+    return conn
+
+
+def _pick(expression):
+    cases = " ".join(f"WHEN {i} THEN '{chain}'" for i, chain in enumerate(CHAINS))
+    return f"CASE ({expression}) % {len(CHAINS)} {cases} END"
+
+
+def arrow_connection(conn):
+    """``conn`` behind the Snowflake connector's ``fetch_arrow_batches`` interface."""
+    return ArrowConnection(conn)
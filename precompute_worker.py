@@ -0,0 +1,112 @@
+"""Precompute the dashboard's panels for the period presets, on a schedule.
+
+    python precompute_worker.py [--once] [--interval-minutes 10] [--secrets .streamlit/secrets.toml]
+
+Every cycle syncs the local transfer store from Snowflake - every configured
+token in one batched query per window - then computes each panel of every
+token and preset of :func:`axelar_its.panels.presets` - at every chart
+timeframe it can be drawn at - into the panel cache. Run it with the same
+secrets as the dashboard (so both use the same store and cache directories)
+and set ``[store] sync_in_app = false`` there: the app then serves the
+presets from finished results and never queries Snowflake to render a page.
+
+Presets reaching into the store's re-check window are recomputed every cycle,
+together with their recent rollup chunks, so they follow each sync. Settled
+presets are recomputed, chunks included, until a cycle has built them on a
+store that covers them (see :meth:`TransferStore.settled_before
+<axelar_its.store.TransferStore.settled_before>`) - the cache may hold results
+the app built before the first backfill or after a store wipe - and are served
+from the cache after that. A new worker process recomputes each of them once.
+"""
+
+import argparse
+import logging
+import time
+from datetime import timedelta
+
+import pandas as pd
+
+from axelar_its import instrumentation, panels
+from axelar_its.panels import PanelService
+from axelar_its.settings import SECRETS_PATH, Settings, load_secrets
+
+logger = logging.getLogger("precompute_worker")
+
+
+def run_cycle(settings, scheduler, store, service, interval, built=None):
+    """Sync the store and bring every preset panel up to date; returns the number of panels written.
+
+    built: ``{(symbol, start_date, end_date): settled_before}`` of the settled presets computed on a store
+           covering them, updated in place and passed to every cycle
+    """
+    built = {} if built is None else built
+    with instrumentation.span("sync", "worker") as span:
+        span["rows"] = store.sync(scheduler)
+    today = pd.Timestamp.now().normalize()
+    refresh_from = today - pd.Timedelta(settings.recheck)
+    written = 0
+    for symbol, planner in service.planners.items():
+        covered = store.settled_before(symbol)
+        for label, (start_date, end_date) in panels.presets(today, store.first_day(symbol)).items():
+            recent = pd.Timestamp(end_date) >= refresh_from
+            preset = (symbol, pd.Timestamp(start_date), pd.Timestamp(end_date))
+            # Built on the coverage the store still has; a store that went back (wiped, refilling) starts over.
+            final = not recent and preset in built and covered is not None and built[preset] <= covered
+            if recent:
+                # Rebuild the chunks a sync may have changed once; the panels below are merged from them.
+                planner.view(start_date, end_date, refresh_from=refresh_from)
+            elif not final:
+                planner.view(start_date, end_date, refresh_from=start_date)
+            for name, (by_timeframe, _) in panels.PANELS.items():
+                timeframes = panels.chart_timeframes(start_date, end_date, settings.max_chart_buckets) if by_timeframe else [None]
+                for timeframe in timeframes:
+                    with instrumentation.span(name, "precompute", symbol=symbol, preset=label, timeframe=timeframe):
+                        if recent:
+                            # Kept until the next cycle has replaced it, even when the sync interval is shorter.
+                            ttl = max(service.cache.ttl_for({"end_date": end_date, "symbol": symbol}), 2 * interval)
+                            service.refresh(name, start_date, end_date, timeframe, symbol=symbol, ttl=ttl)
+                        elif not final:
+                            service.refresh(name, start_date, end_date, timeframe, symbol=symbol)
+                        else:
+                            service.load(name, start_date, end_date, timeframe, symbol=symbol)
+                    written += 1
+            if not recent and not final and covered is not None and preset[2] + pd.Timedelta(days=1) <= covered:
+                built[preset] = covered
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--secrets", default=SECRETS_PATH, help=f"secrets file shared with the dashboard (default: {SECRETS_PATH})")
+    parser.add_argument("--interval-minutes", type=float, help="time between cycles (default: [store] sync_minutes)")
+    parser.add_argument("--once", action="store_true", help="run a single cycle and exit, e.g. from cron")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    settings = Settings(load_secrets(args.secrets))
+    interval = timedelta(minutes=args.interval_minutes) if args.interval_minutes else settings.sync_interval
+    scheduler = settings.query_scheduler(settings.connection_pool())
+    store = settings.transfer_store()
+    cache = settings.panel_cache(store)
+    service = PanelService(cache, settings.range_planners(cache, store.read))
+    built = {}
+
+    try:
+        while True:
+            started = time.monotonic()
+            try:
+                written = run_cycle(settings, scheduler, store, service, interval, built)
+                logger.info("precomputed %d panels in %.1f s; %s", written, time.monotonic() - started, cache.stats())
+            except Exception:
+                if args.once:
+                    raise
+                logger.exception("precompute cycle failed; retrying next cycle")
+            if args.once:
+                return
+            time.sleep(max(0.0, interval.total_seconds() - (time.monotonic() - started)))
+    finally:
+        scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Sender sketches: HyperLogLog accuracy on synthetic addresses, and exact and approximate modes agreeing."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from axelar_its.sketches import ExactSketch, HyperLogLog, count_all, group_sketches, merge_all, sketch_factory
+
+PRECISION = 12
+BOUND = 3 * HyperLogLog.relative_error(PRECISION)
+
+
+def addresses(n, seed=7):
+    rng = np.random.default_rng(seed)
+    return np.array([f"0x{value:040x}" for value in rng.integers(0, 2**63, size=n, dtype=np.int64)], dtype=object)
+
+
+def daily(values, days=30):
+    """Split ``values`` into per-day chunks, repeating a third of them so duplicates span days."""
+    values = np.concatenate([values, values[: len(values) // 3]])
+    return np.array_split(values, days)
+
+
+@pytest.mark.parametrize("n", [100, 1_000, 10_000, 100_000])
+def test_hll_error_within_bound(n):
+    values = addresses(n)
+    estimate = HyperLogLog.from_values(values, PRECISION).count()
+    assert abs(estimate - n) / n <= BOUND
+
+
+@pytest.mark.parametrize("mode", ["exact", "approx"])
+def test_merge_many_matches_pairwise_merges(mode):
+    make_sketch = sketch_factory(mode, PRECISION)
+    sketches = [make_sketch(chunk) for chunk in daily(addresses(5_000))]
+    pairwise = sketches[0]
+    for sketch in sketches[1:]:
+        pairwise = pairwise.merge(sketch)
+    merged = type(sketches[0]).merge_many(sketches)
+    assert merged.count() == pairwise.count()
+    if mode == "approx":
+        np.testing.assert_array_equal(merged.registers, pairwise.registers)
+    else:
+        assert merged.values == pairwise.values
+
+
+@pytest.mark.parametrize("n", [1_000, 50_000])
+def test_count_all_exact_and_approx_agree(n):
+    chunks = daily(addresses(n))
+    exact = count_all(ExactSketch.from_values(chunk) for chunk in chunks)
+    approx = count_all(HyperLogLog.from_values(chunk, PRECISION) for chunk in chunks)
+    assert exact == n
+    assert abs(approx - exact) / exact <= BOUND
+    # Merging the days gives the sketch of all values at once.
+    assert approx == HyperLogLog.from_values(np.concatenate(chunks), PRECISION).count()
+
+
+def test_merge_all_of_nothing():
+    assert merge_all([]) is None
+    assert count_all(iter([])) == 0
+
+
+def test_merge_many_rejects_mixed_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog.merge_many([HyperLogLog(12), HyperLogLog(14)])
+
+
+@pytest.mark.parametrize("mode", ["exact", "approx"])
+def test_group_sketches_match_per_group_builds(mode):
+    make_sketch = sketch_factory(mode, PRECISION)
+    values = pd.Series(addresses(3_000), dtype=object)
+    values[::17] = None
+    groups = np.random.default_rng(3).integers(0, 40, size=len(values))
+    groups[groups == 5] = 6  # group 5 stays empty
+    built = group_sketches(make_sketch, groups, 40, values)
+    assert len(built) == 40
+    for group, sketch in enumerate(built):
+        expected = make_sketch(values[groups == group])
+        assert type(sketch) is type(expected)
+        assert sketch.count() == expected.count()
+    assert built[5].count() == 0
+    assert count_all(built) == make_sketch(values).count()
+
+
+def test_group_sketches_exact_and_approx_agree():
+    values = pd.Series(addresses(20_000), dtype="category")
+    groups = np.arange(len(values)) % 24
+    exact = group_sketches(sketch_factory("exact"), groups, 24, values)
+    approx = group_sketches(sketch_factory("approx", PRECISION), groups, 24, values)
+    for e, a in zip(exact, approx):
+        assert abs(a.count() - e.count()) / e.count() <= BOUND
+    assert count_all(exact) == 20_000
+    assert abs(count_all(approx) - 20_000) / 20_000 <= BOUND